@@ -1,3 +1,4 @@
+from datetime import timedelta
 from pathlib import Path
 import os
 from dotenv import load_dotenv
@@ -72,10 +73,61 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # take the write lock at BEGIN so concurrent read-then-write transactions queue
+        # for up to `timeout` seconds instead of failing with "database is locked"
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
+    }
+}
+
+
+# CACHE_BACKEND is "locmem", "file" or a dotted cache backend path for a shared
+# cache (redis, memcached, database); CACHE_LOCATION is passed through as-is.
+CACHE_BACKEND_ALIASES = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+}
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "locmem").strip()
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND_ALIASES.get(CACHE_BACKEND, CACHE_BACKEND),
+        'LOCATION': os.getenv(
+            "CACHE_LOCATION",
+            str(BASE_DIR / 'cache') if CACHE_BACKEND == "file" else "madstore",
+        ),
     }
 }
 
 
+def _state_cache(name):
+    # an alias for state that must not be evicted to make room for cached responses;
+    # <NAME>_CACHE_BACKEND / <NAME>_CACHE_LOCATION default to the CACHE_* settings
+    prefix = name.upper()
+    backend = os.getenv(f"{prefix}_CACHE_BACKEND", CACHE_BACKEND).strip()
+    if backend == "locmem":
+        default_location = f"madstore-{name}"
+    elif backend == "file":
+        default_location = str(BASE_DIR / f'cache-{name}')
+    else:
+        default_location = os.getenv("CACHE_LOCATION", "")
+    config = {
+        'BACKEND': CACHE_BACKEND_ALIASES.get(backend, backend),
+        'LOCATION': os.getenv(f"{prefix}_CACHE_LOCATION", default_location),
+        'KEY_PREFIX': name,
+        'TIMEOUT': None,
+    }
+    if backend in CACHE_BACKEND_ALIASES:
+        # locmem and file cull once MAX_ENTRIES (300 by default) is reached
+        config['OPTIONS'] = {'MAX_ENTRIES': int(os.getenv(f"{prefix}_CACHE_MAX_ENTRIES", "1000000"))}
+    return config
+
+
+CACHES['carts'] = _state_cache("carts")
+CACHES['ratelimit'] = _state_cache("ratelimit")
+
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -117,7 +169,26 @@ AUTH_USER_MODEL = 'apiApp.CustomUser'
 STRIPE_SECRET_KEY = os.getenv("STRIPE_SECRET_KEY")
 STRIPE_PUBLIC_KEY = os.getenv("STRIPE_PUBLIC_KEY")
 WEB_HOOK_SECRET_KEY = os.getenv("WEB_HOOK_SECRET_KEY")
+# "stripe", or "fake" for the in-process gateway used by `manage.py bench_checkout`
+PAYMENT_GATEWAY_ALIASES = {
+    "stripe": "apiApp.payments.StripeGateway",
+    "fake": "apiApp.payments.FakeGateway",
+}
+PAYMENT_GATEWAY = os.getenv("PAYMENT_GATEWAY", "stripe").strip()
+PAYMENT_GATEWAY = PAYMENT_GATEWAY_ALIASES.get(PAYMENT_GATEWAY, PAYMENT_GATEWAY)
+PAYMENT_GATEWAY_LATENCY_MS = int(os.getenv("PAYMENT_GATEWAY_LATENCY_MS", "0"))
 GOOGLE_OAUTH_CLIENT_ID = os.getenv("GOOGLE_OAUTH_CLIENT_ID")
+# Google ID tokens are verified locally against this key set; GOOGLE_JWKS_FILE (a saved
+# JWKS document) replaces the network fetch for tests and offline setups
+GOOGLE_JWKS_URL = os.getenv("GOOGLE_JWKS_URL", "https://www.googleapis.com/oauth2/v3/certs")
+GOOGLE_JWKS_FILE = os.getenv("GOOGLE_JWKS_FILE", "").strip()
+
+# login/register/google_login issue these; the per-user endpoints read the user id and email
+# straight from the signed access token, without a user query
+SIMPLE_JWT = {
+    "ACCESS_TOKEN_LIFETIME": timedelta(minutes=int(os.getenv("JWT_ACCESS_TOKEN_MINUTES", "15"))),
+    "REFRESH_TOKEN_LIFETIME": timedelta(days=int(os.getenv("JWT_REFRESH_TOKEN_DAYS", "7"))),
+}
 GOOGLE_OAUTH_ALLOWED_ORIGINS = [
     origin.strip().rstrip("/")
     for origin in os.getenv(
@@ -129,6 +200,34 @@ GOOGLE_OAUTH_ALLOWED_ORIGINS = [
 
 FRONTEND_BASE_URL = os.getenv("FRONTEND_BASE_URL", "http://localhost:5173").rstrip("/")
 
+CATALOG_PAGE_SIZE = int(os.getenv("CATALOG_PAGE_SIZE", "24"))
+CATALOG_MAX_PAGE_SIZE = int(os.getenv("CATALOG_MAX_PAGE_SIZE", "100"))
+# lower bounds (INR) of the price facet buckets; the last bucket is open ended
+CATALOG_PRICE_BUCKETS = [0, 500, 1000, 5000, 10000, 50000]
+# catalog responses are cached per CatalogVersion, so the timeout only bounds memory
+CATALOG_CACHE_ALIAS = "default"
+CATALOG_CACHE_TIMEOUT = int(os.getenv("CATALOG_CACHE_TIMEOUT", "3600"))
+
+# carts untouched for this many days are removed by `manage.py reap_carts`
+CART_IDLE_TTL_DAYS = int(os.getenv("CART_IDLE_TTL_DAYS", "30"))
+# "db" keeps carts in Cart/CartItem rows; "cache" keeps them in CART_CACHE_ALIAS and only
+# writes rows at checkout. Any other value is a dotted apiApp.cart_storage.CartStorage path.
+CART_STORAGE_ALIASES = {
+    "db": "apiApp.cart_storage.DatabaseCartStorage",
+    "cache": "apiApp.cart_storage.CacheCartStorage",
+}
+CART_STORAGE = os.getenv("CART_STORAGE", "db").strip()
+CART_STORAGE = CART_STORAGE_ALIASES.get(CART_STORAGE, CART_STORAGE)
+CART_CACHE_ALIAS = "carts"
+
+# dotted path to an apiApp.search backend; empty picks one for the database vendor
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "").strip()
+# minimum share of query trigrams a product name must contain to be a fuzzy hit
+FUZZY_SEARCH_THRESHOLD = float(os.getenv("FUZZY_SEARCH_THRESHOLD", "0.3"))
+# seconds before a worker reloads its autocomplete index to pick up other workers' writes
+SUGGEST_INDEX_TTL = int(os.getenv("SUGGEST_INDEX_TTL", "300"))
+SUGGEST_MAX_RESULTS = 20
+
 
 def _env_bool(name, default=False):
     value = os.getenv(name)
@@ -155,3 +254,33 @@ EMAIL_TIMEOUT = int(os.getenv("EMAIL_TIMEOUT", "20"))
 if not EMAIL_BACKEND:
     has_smtp_creds = bool(EMAIL_HOST and EMAIL_HOST_USER and EMAIL_HOST_PASSWORD)
     EMAIL_BACKEND = SMTP_BACKEND if has_smtp_creds else CONSOLE_BACKEND
+
+# `manage.py send_outbox` claims this many queued emails per SMTP connection; failed sends
+# are retried after EMAIL_OUTBOX_RETRY_SECONDS * 2**(attempts - 1), up to the attempt limit
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", "50"))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "6"))
+EMAIL_OUTBOX_RETRY_SECONDS = int(os.getenv("EMAIL_OUTBOX_RETRY_SECONDS", "30"))
+# a claimed batch that is not finished within this many seconds (worker died) is claimable again
+EMAIL_OUTBOX_LEASE_SECONDS = int(os.getenv("EMAIL_OUTBOX_LEASE_SECONDS", "300"))
+
+# verified Stripe webhook events are stored and then applied by `manage.py process_payment_events`
+PAYMENT_EVENT_BATCH_SIZE = int(os.getenv("PAYMENT_EVENT_BATCH_SIZE", "100"))
+PAYMENT_EVENT_MAX_ATTEMPTS = int(os.getenv("PAYMENT_EVENT_MAX_ATTEMPTS", "8"))
+PAYMENT_EVENT_RETRY_SECONDS = int(os.getenv("PAYMENT_EVENT_RETRY_SECONDS", "10"))
+PAYMENT_EVENT_LEASE_SECONDS = int(os.getenv("PAYMENT_EVENT_LEASE_SECONDS", "300"))
+
+# apiApp.ratelimit buckets, "<tokens>/<period>" with period s, m or h (optionally prefixed by a
+# count, e.g. "5/10m"); a bucket holds that many tokens and refills fully once per period.
+# Keys are "<scope>:ip" and "<scope>:identity"; remove an entry to disable that bucket.
+# The counters live in RATE_LIMIT_CACHE_ALIAS, which must be a shared cache with several workers
+# and must not be one that cached responses can evict (clients could then reset their limits).
+RATE_LIMITS = {
+    "login:ip": os.getenv("RATE_LIMIT_LOGIN_IP", "20/m"),
+    "login:identity": os.getenv("RATE_LIMIT_LOGIN_IDENTITY", "5/m"),
+    "otp:ip": os.getenv("RATE_LIMIT_OTP_IP", "10/m"),
+    "otp:identity": os.getenv("RATE_LIMIT_OTP_IDENTITY", "1/m"),
+    "search:ip": os.getenv("RATE_LIMIT_SEARCH_IP", "60/m"),
+}
+RATE_LIMIT_CACHE_ALIAS = "ratelimit"
+# only enable behind a proxy that overwrites X-Forwarded-For; clients can forge it otherwise
+RATE_LIMIT_TRUST_FORWARDED_FOR = _env_bool("RATE_LIMIT_TRUST_FORWARDED_FOR", False)
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import Carousel, Cart, CartItem, CustomUser, Order, OrderItem, ProductImage, ProductRating , Product , Category, Review, WishList
+from .models import Carousel, Cart, CartItem, CustomUser, EmailOutbox, Order, OrderItem, PaymentEvent, ProductImage, ProductRating , Product , Category, Review, WishList
 class CustomUserAdmin(UserAdmin):
     list_display = ("username", "email","first_name","last_name")
 
@@ -24,4 +24,50 @@ class CategoryAdmin(admin.ModelAdmin):
 
 admin.site.register(Category , CategoryAdmin)
 
-admin.site.register([Cart , CartItem , Review , ProductRating , WishList , Order , OrderItem , Carousel])
+admin.site.register([Cart , Review , WishList , Order , OrderItem , Carousel])
+
+
+class CartItemAdmin(admin.ModelAdmin):
+    # Cart.total_quantity/subtotal are only kept in step by apiApp.carts, so items are view-only here
+    list_display = ("cart", "product", "quantity")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+admin.site.register(CartItem, CartItemAdmin)
+
+
+class ProductRatingAdmin(admin.ModelAdmin):
+    # maintained from Review writes (and mirrored on Product.average_rating); fix drift with rebuild_ratings
+    list_display = ("product", "average_rating", "total_reviews")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+admin.site.register(ProductRating, ProductRatingAdmin)
+
+
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ("subject", "to", "status", "attempts", "next_attempt_at", "sent_at")
+    list_filter = ("status",)
+
+admin.site.register(EmailOutbox, EmailOutboxAdmin)
+
+
+class PaymentEventAdmin(admin.ModelAdmin):
+    list_display = ("event_id", "type", "status", "attempts", "created_at", "processed_at")
+    list_filter = ("status", "type")
+
+admin.site.register(PaymentEvent, PaymentEventAdmin)
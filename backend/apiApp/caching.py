@@ -0,0 +1,85 @@
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from .models import CatalogVersion
+
+
+def _catalog_state(request):
+    # etag_func and last_modified_func both run per request; read the version once
+    state = getattr(request, "_catalog_state", None)
+    if state is None:
+        state = request._catalog_state = CatalogVersion.current()
+    return state
+
+
+def _variant_digest(request):
+    variant = f"{request.get_full_path()}|{request.headers.get('Accept', '')}"
+    return hashlib.sha1(variant.encode()).hexdigest()[:16]
+
+
+def _catalog_etag(request, *args, **kwargs):
+    version, _ = _catalog_state(request)
+    return f"{version}-{_variant_digest(request)}"
+
+
+def _catalog_last_modified(request, *args, **kwargs):
+    _, updated_at = _catalog_state(request)
+    return updated_at
+
+
+def catalog_conditional(view):
+    """Conditional GET for read-only catalog views.
+
+    ETag and Last-Modified come from CatalogVersion, so a matching
+    If-None-Match / If-Modified-Since is answered with 304 before the view
+    (and its serializers) runs. Clients and CDNs must revalidate every time,
+    which is what keeps the cheap 304 path correct after a catalog change.
+    """
+    conditional_view = condition(etag_func=_catalog_etag, last_modified_func=_catalog_last_modified)(view)
+
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        response = conditional_view(request, *args, **kwargs)
+        patch_cache_control(response, public=True, no_cache=True)
+        return response
+
+    return wrapped
+
+
+def cache_catalog_response(view):
+    """Cache rendered catalog responses under the current CatalogVersion.
+
+    A catalog write bumps the version, so every worker simply stops reading
+    the old keys; nothing is deleted and stale entries age out by timeout.
+    """
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return view(request, *args, **kwargs)
+
+        cache = caches[settings.CATALOG_CACHE_ALIAS]
+        version, _ = _catalog_state(request)
+        key = f"catalog:{version}:{_variant_digest(request)}"
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+
+        response = view(request, *args, **kwargs)
+        if response.status_code == 200:
+            if hasattr(response, "render"):
+                response.render()
+            cache.set(
+                key,
+                (response.content, response["Content-Type"]),
+                settings.CATALOG_CACHE_TIMEOUT,
+            )
+        return response
+
+    return wrapped
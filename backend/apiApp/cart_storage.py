@@ -0,0 +1,292 @@
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils.module_loading import import_string
+
+from .carts import adjust_cart_totals, apply_cart_operations, recalculate_cart_totals
+from .models import Cart, CartItem, Product
+from .serializers import CartItemSerializer, CartSerializer, ProductListSerializer
+
+
+class CartNotFound(Exception):
+    pass
+
+
+class CartBusy(Exception):
+    # another request holds the cart's write lock; the client should retry
+    pass
+
+
+def empty_cart_payload(cart_code):
+    return {"id": None, "cart_code": cart_code, "cartitems": [], "cart_total": 0}
+
+
+class CartStorage:
+    """Where carts live between the first add and checkout.
+
+    Item ids are backend specific; clients must echo back the ids they got
+    from ``detail``. ``materialize`` returns the ORM Cart that checkout reads,
+    and ``discard`` drops the cart once an order has been created from it.
+    """
+
+    def detail(self, cart_code):
+        raise NotImplementedError
+
+    def line(self, cart_code, product_id):
+        raise NotImplementedError
+
+    def add(self, cart_code, product, quantity=1):
+        raise NotImplementedError
+
+    def update_item(self, item_id, quantity, cart_code=None):
+        raise NotImplementedError
+
+    def delete_item(self, item_id, cart_code=None):
+        raise NotImplementedError
+
+    def apply_operations(self, cart_code, operations, products):
+        raise NotImplementedError
+
+    def materialize(self, cart_code):
+        raise NotImplementedError
+
+    def discard(self, cart_code):
+        raise NotImplementedError
+
+
+class DatabaseCartStorage(CartStorage):
+
+    def detail(self, cart_code):
+        cart = Cart.objects.prefetch_related("cartitems__product__rating").filter(cart_code=cart_code).first()
+        if cart is None:
+            return empty_cart_payload(cart_code)
+        return CartSerializer(cart).data
+
+    def line(self, cart_code, product_id):
+        cartitem = CartItem.objects.select_related("cart", "product__rating").get(
+            cart__cart_code=cart_code, product_id=product_id
+        )
+        return {
+            "cart_code": cart_code,
+            "item": CartItemSerializer(cartitem).data,
+            "total_quantity": cartitem.cart.total_quantity,
+            "cart_total": cartitem.cart.subtotal,
+        }
+
+    def add(self, cart_code, product, quantity=1):
+        with transaction.atomic():
+            cart, _ = Cart.objects.get_or_create(cart_code=cart_code)
+            # UPDATE ... SET quantity = quantity + n first; the unique (cart, product)
+            # constraint turns a concurrent first insert into a retryable IntegrityError
+            lookup = CartItem.objects.filter(cart=cart, product=product)
+            if not lookup.update(quantity=F("quantity") + quantity):
+                try:
+                    with transaction.atomic():
+                        CartItem.objects.create(cart=cart, product=product, quantity=quantity)
+                except IntegrityError:
+                    lookup.update(quantity=F("quantity") + quantity)
+            adjust_cart_totals(cart.id, quantity, quantity * product.price)
+
+    def _locked_item(self, item_id, cart_code):
+        items = CartItem.objects.select_for_update().select_related("product")
+        if cart_code:
+            items = items.filter(cart__cart_code=cart_code)
+        try:
+            return items.get(id=item_id)
+        except (CartItem.DoesNotExist, ValueError, TypeError):
+            raise CartNotFound()
+
+    def update_item(self, item_id, quantity, cart_code=None):
+        with transaction.atomic():
+            cartitem = self._locked_item(item_id, cart_code)
+            delta = quantity - cartitem.quantity
+            cartitem.quantity = quantity
+            cartitem.save(update_fields=["quantity"])
+            adjust_cart_totals(cartitem.cart_id, delta, delta * cartitem.product.price)
+        return CartItemSerializer(cartitem).data
+
+    def delete_item(self, item_id, cart_code=None):
+        with transaction.atomic():
+            cartitem = self._locked_item(item_id, cart_code)
+            cartitem.delete()
+            adjust_cart_totals(cartitem.cart_id, -cartitem.quantity, -cartitem.quantity * cartitem.product.price)
+
+    def apply_operations(self, cart_code, operations, products):
+        with transaction.atomic():
+            cart, _ = Cart.objects.get_or_create(cart_code=cart_code)
+            cart = Cart.objects.select_for_update().get(id=cart.id)
+            apply_cart_operations(cart, operations, products)
+
+    def materialize(self, cart_code):
+        return Cart.objects.filter(cart_code=cart_code).first()
+
+    def discard(self, cart_code):
+        Cart.objects.filter(cart_code=cart_code).delete()
+
+
+class CacheCartStorage(CartStorage):
+    """Carts kept in the Django cache as ``{product_id: quantity}``.
+
+    Nothing touches the database until checkout calls ``materialize``, so the
+    add/update/delete hot path never takes the SQLite write lock. Item ids are
+    product ids, which are unique within a cart. Writes are serialized per
+    cart with a ``cache.add`` lock, which is atomic on locmem, memcached and
+    redis. locmem is per process, so use a shared cache with several workers.
+    """
+
+    lock_timeout = 5
+    lock_attempts = 200
+
+    def __init__(self):
+        self.cache = caches[settings.CART_CACHE_ALIAS]
+        self.timeout = settings.CART_IDLE_TTL_DAYS * 24 * 60 * 60
+
+    def _key(self, cart_code):
+        return f"cart:{cart_code}"
+
+    def _load(self, cart_code):
+        return self.cache.get(self._key(cart_code))
+
+    def _store(self, cart_code, items):
+        self.cache.set(self._key(cart_code), items, self.timeout)
+
+    @contextmanager
+    def _lock(self, cart_code):
+        key = f"{self._key(cart_code)}:lock"
+        token = uuid.uuid4().hex
+        for _ in range(self.lock_attempts):
+            if self.cache.add(key, token, self.lock_timeout):
+                break
+            time.sleep(0.005)
+        else:
+            raise CartBusy(f"Could not lock cart {cart_code}.")
+        try:
+            yield
+        finally:
+            if self.cache.get(key) == token:
+                self.cache.delete(key)
+
+    def _line_payload(self, product, quantity):
+        return {
+            "id": product.id,
+            "product": ProductListSerializer(product).data,
+            "quantity": quantity,
+            "sub_total": product.price * quantity,
+        }
+
+    def detail(self, cart_code):
+        items = self._load(cart_code)
+        if not items:
+            return empty_cart_payload(cart_code)
+        products = Product.objects.select_related("rating").in_bulk(items.keys())
+        lines = [
+            self._line_payload(products[product_id], quantity)
+            for product_id, quantity in items.items()
+            if product_id in products
+        ]
+        return {
+            "id": None,
+            "cart_code": cart_code,
+            "cartitems": lines,
+            "cart_total": sum((line["sub_total"] for line in lines), 0),
+        }
+
+    def line(self, cart_code, product_id):
+        items = self._load(cart_code) or {}
+        products = Product.objects.select_related("rating").in_bulk(items.keys())
+        product = products[product_id]
+        return {
+            "cart_code": cart_code,
+            "item": self._line_payload(product, items[product_id]),
+            "total_quantity": sum(quantity for pk, quantity in items.items() if pk in products),
+            "cart_total": sum(
+                (products[pk].price * quantity for pk, quantity in items.items() if pk in products), 0
+            ),
+        }
+
+    def add(self, cart_code, product, quantity=1):
+        with self._lock(cart_code):
+            items = self._load(cart_code) or {}
+            items[product.id] = items.get(product.id, 0) + quantity
+            self._store(cart_code, items)
+
+    def _item_product_id(self, item_id):
+        try:
+            return int(item_id)
+        except (TypeError, ValueError):
+            raise CartNotFound()
+
+    def update_item(self, item_id, quantity, cart_code=None):
+        if not cart_code:
+            raise CartNotFound()
+        product_id = self._item_product_id(item_id)
+        with self._lock(cart_code):
+            items = self._load(cart_code) or {}
+            if product_id not in items:
+                raise CartNotFound()
+            items[product_id] = quantity
+            self._store(cart_code, items)
+        product = Product.objects.select_related("rating").filter(id=product_id).first()
+        if product is None:
+            raise CartNotFound()
+        return self._line_payload(product, quantity)
+
+    def delete_item(self, item_id, cart_code=None):
+        if not cart_code:
+            raise CartNotFound()
+        product_id = self._item_product_id(item_id)
+        with self._lock(cart_code):
+            items = self._load(cart_code) or {}
+            if items.pop(product_id, None) is None:
+                raise CartNotFound()
+            self._store(cart_code, items)
+
+    def apply_operations(self, cart_code, operations, products):
+        with self._lock(cart_code):
+            items = self._load(cart_code) or {}
+            for op, product_id, quantity in operations:
+                if op == "add":
+                    items[product_id] = items.get(product_id, 0) + quantity
+                elif op == "set" and quantity:
+                    items[product_id] = quantity
+                else:
+                    items.pop(product_id, None)
+            self._store(cart_code, items)
+
+    def materialize(self, cart_code):
+        items = self._load(cart_code)
+        if not items:
+            return Cart.objects.filter(cart_code=cart_code).first()
+        with transaction.atomic():
+            cart, _ = Cart.objects.get_or_create(cart_code=cart_code)
+            cart = Cart.objects.select_for_update().get(id=cart.id)
+            cart.cartitems.all().delete()
+            existing = set(Product.objects.filter(id__in=items.keys()).values_list("id", flat=True))
+            CartItem.objects.bulk_create([
+                CartItem(cart=cart, product_id=product_id, quantity=quantity)
+                for product_id, quantity in items.items()
+                if product_id in existing
+            ])
+            recalculate_cart_totals(Cart.objects.filter(id=cart.id))
+        return cart
+
+    def discard(self, cart_code):
+        # checkout discards inside the order transaction; keep the cart if that rolls back
+        key = self._key(cart_code)
+        transaction.on_commit(lambda: self.cache.delete(key))
+        Cart.objects.filter(cart_code=cart_code).delete()
+
+
+_storage = None
+
+
+def get_cart_storage():
+    global _storage
+    if _storage is None:
+        _storage = import_string(settings.CART_STORAGE)()
+    return _storage
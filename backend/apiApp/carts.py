@@ -0,0 +1,84 @@
+from django.db.models import DecimalField, ExpressionWrapper, F, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Cart, CartItem
+
+
+def adjust_cart_totals(cart_id, quantity_delta, amount_delta):
+    # must run in the same transaction as the CartItem write it mirrors
+    Cart.objects.filter(pk=cart_id).update(
+        total_quantity=F("total_quantity") + quantity_delta,
+        subtotal=F("subtotal") + amount_delta,
+        updated_at=timezone.now(),
+    )
+
+
+def recalculate_cart_totals(carts):
+    """Recompute the stored totals of ``carts`` from their items in one UPDATE.
+
+    Used when totals cannot be adjusted by a delta, e.g. after a price change
+    or when products are deleted out from under existing carts.
+    """
+    items = CartItem.objects.filter(cart=OuterRef("pk")).order_by().values("cart")
+    quantity = items.annotate(total=Sum("quantity")).values("total")
+    amount = items.annotate(
+        total=Sum(
+            ExpressionWrapper(F("quantity") * F("product__price"), output_field=DecimalField())
+        )
+    ).values("total")
+    carts.update(
+        total_quantity=Coalesce(Subquery(quantity, output_field=IntegerField()), Value(0)),
+        subtotal=Coalesce(Subquery(amount, output_field=DecimalField()), Value(0), output_field=DecimalField()),
+    )
+
+
+def apply_cart_operations(cart, operations, products):
+    """Apply parsed ``(op, product_id, quantity)`` operations to ``cart``.
+
+    Operations are folded in memory first, so the database sees at most one
+    bulk insert, one bulk update, one delete and one totals update no matter
+    how many operations were sent. Call inside a transaction.
+    """
+    existing = {
+        item.product_id: item
+        for item in CartItem.objects.select_for_update().filter(
+            cart=cart, product_id__in=products.keys()
+        )
+    }
+    quantities = {product_id: item.quantity for product_id, item in existing.items()}
+    for op, product_id, quantity in operations:
+        current = quantities.get(product_id, 0)
+        if op == "add":
+            quantities[product_id] = current + quantity
+        elif op == "set":
+            quantities[product_id] = quantity
+        else:
+            quantities[product_id] = 0
+
+    to_create, to_update, to_delete = [], [], []
+    quantity_delta = 0
+    amount_delta = 0
+    for product_id, quantity in quantities.items():
+        item = existing.get(product_id)
+        previous = item.quantity if item else 0
+        if quantity == previous:
+            continue
+        quantity_delta += quantity - previous
+        amount_delta += (quantity - previous) * products[product_id].price
+        if item is None:
+            to_create.append(CartItem(cart=cart, product_id=product_id, quantity=quantity))
+        elif quantity == 0:
+            to_delete.append(item.id)
+        else:
+            item.quantity = quantity
+            to_update.append(item)
+
+    if to_create:
+        CartItem.objects.bulk_create(to_create)
+    if to_update:
+        CartItem.objects.bulk_update(to_update, ["quantity"])
+    if to_delete:
+        CartItem.objects.filter(id__in=to_delete).delete()
+    if quantity_delta or amount_delta:
+        adjust_cart_totals(cart.id, quantity_delta, amount_delta)
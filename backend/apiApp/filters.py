@@ -0,0 +1,111 @@
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db.models import Count, Q
+
+from .models import Product
+
+
+RATING_BANDS = [4, 3, 2, 1]
+
+
+class FilterError(ValueError):
+    pass
+
+
+def _decimal(params, name):
+    value = params.get(name)
+    if value in (None, ""):
+        return None
+    try:
+        number = Decimal(value)
+    except InvalidOperation as exc:
+        raise FilterError(f"{name} must be a number.") from exc
+    if not number.is_finite():
+        raise FilterError(f"{name} must be a number.")
+    return number
+
+
+def parse_product_filters(params):
+    filters = {}
+    categories = [slug for slug in (params.get("category") or "").split(",") if slug]
+    if categories:
+        filters["category"] = categories
+    for name in ["min_price", "max_price", "min_rating"]:
+        value = _decimal(params, name)
+        if value is not None:
+            filters[name] = value
+    featured = (params.get("featured") or "").strip().lower()
+    if featured:
+        if featured not in {"1", "true", "0", "false"}:
+            raise FilterError("featured must be true or false.")
+        filters["featured"] = featured in {"1", "true"}
+    return filters
+
+
+def catalog_queryset():
+    # the rating row only feeds the review count in list payloads; sorting and
+    # filtering use the indexed Product.average_rating
+    return Product.objects.select_related("rating")
+
+
+def apply_product_filters(queryset, filters, exclude=None):
+    conditions = Q()
+    if "category" in filters and exclude != "category":
+        conditions &= Q(category__slug__in=filters["category"])
+    if "min_price" in filters and exclude != "price":
+        conditions &= Q(price__gte=filters["min_price"])
+    if "max_price" in filters and exclude != "price":
+        conditions &= Q(price__lte=filters["max_price"])
+    if "min_rating" in filters and exclude != "rating":
+        conditions &= Q(average_rating__gte=float(filters["min_rating"]))
+    if "featured" in filters:
+        conditions &= Q(featured=filters["featured"])
+    return queryset.filter(conditions)
+
+
+def product_facets(filters):
+    """Facet counts for the catalog, each ignoring its own dimension's filter.
+
+    That way the category facet still lists the other categories a shopper can
+    switch to. Each facet is one aggregate query.
+    """
+    base = catalog_queryset()
+
+    categories = (
+        apply_product_filters(base, filters, exclude="category")
+        .filter(category__isnull=False)
+        .values("category__slug", "category__name")
+        .annotate(count=Count("id"))
+        .order_by("category__name")
+    )
+
+    bounds = settings.CATALOG_PRICE_BUCKETS
+    buckets = list(zip(bounds, bounds[1:] + [None]))
+    price_counts = apply_product_filters(base, filters, exclude="price").aggregate(**{
+        f"bucket_{index}": Count(
+            "id",
+            filter=Q(price__gte=low) & (Q(price__lt=high) if high is not None else Q()),
+        )
+        for index, (low, high) in enumerate(buckets)
+    })
+
+    rating_counts = apply_product_filters(base, filters, exclude="rating").aggregate(**{
+        f"band_{band}": Count("id", filter=Q(average_rating__gte=band))
+        for band in RATING_BANDS
+    })
+
+    return {
+        "category": [
+            {"slug": row["category__slug"], "name": row["category__name"], "count": row["count"]}
+            for row in categories
+        ],
+        "price": [
+            {"min": low, "max": high, "count": price_counts[f"bucket_{index}"]}
+            for index, (low, high) in enumerate(buckets)
+        ],
+        "rating": [
+            {"min_rating": band, "count": rating_counts[f"band_{band}"]}
+            for band in RATING_BANDS
+        ],
+    }
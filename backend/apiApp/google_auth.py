@@ -0,0 +1,107 @@
+import json
+import re
+import threading
+import time
+
+import jwt
+import requests
+from django.conf import settings
+
+
+GOOGLE_ISSUERS = ["accounts.google.com", "https://accounts.google.com"]
+# used when the JWKS response has no usable Cache-Control max-age
+DEFAULT_JWKS_TTL = 3600
+# an unknown kid forces a refetch (key rotation), but at most this often
+MIN_FORCED_REFRESH_SECONDS = 60
+CLOCK_SKEW_SECONDS = 30
+
+
+def _max_age(response):
+    match = re.search(r"max-age=(\d+)", response.headers.get("Cache-Control", ""))
+    if not match:
+        return DEFAULT_JWKS_TTL
+    age = int(response.headers.get("Age", "0") or 0)
+    return max(int(match.group(1)) - age, 0)
+
+
+class GoogleKeySet:
+    """Google's signing keys, fetched once and kept until Cache-Control says otherwise.
+
+    With GOOGLE_JWKS_FILE set the keys are read from that file instead of the
+    network, so tests and offline setups verify tokens without any HTTP call.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._session = requests.Session()
+        self._keys = {}
+        self._expires_at = 0
+        self._fetched_at = None
+
+    def _load(self):
+        if settings.GOOGLE_JWKS_FILE:
+            with open(settings.GOOGLE_JWKS_FILE) as handle:
+                return json.load(handle), DEFAULT_JWKS_TTL
+        response = self._session.get(settings.GOOGLE_JWKS_URL, timeout=8)
+        response.raise_for_status()
+        return response.json(), _max_age(response)
+
+    def refresh(self):
+        try:
+            data, ttl = self._load()
+            key_set = jwt.PyJWKSet.from_dict(data)
+        except (OSError, ValueError, requests.RequestException, jwt.PyJWTError) as exc:
+            if self._keys:
+                # keep serving the keys we have; Google rotates slowly
+                self._expires_at = time.monotonic() + MIN_FORCED_REFRESH_SECONDS
+                return
+            raise ValueError("Could not load Google signing keys.") from exc
+        self._keys = {key.key_id: key for key in key_set.keys}
+        self._fetched_at = time.monotonic()
+        self._expires_at = self._fetched_at + ttl
+
+    def get(self, kid):
+        with self._lock:
+            if time.monotonic() >= self._expires_at:
+                self.refresh()
+            key = self._keys.get(kid)
+            if key is None and (
+                self._fetched_at is None
+                or time.monotonic() - self._fetched_at >= MIN_FORCED_REFRESH_SECONDS
+            ):
+                self.refresh()
+                key = self._keys.get(kid)
+        if key is None:
+            raise ValueError("Invalid Google token.")
+        return key
+
+
+google_keys = GoogleKeySet()
+
+
+def verify_google_id_token(id_token, client_id):
+    try:
+        kid = jwt.get_unverified_header(id_token).get("kid")
+    except jwt.PyJWTError as exc:
+        raise ValueError("Invalid Google token.") from exc
+
+    key = google_keys.get(kid)
+    try:
+        payload = jwt.decode(
+            id_token,
+            key=key,
+            algorithms=["RS256"],
+            audience=client_id,
+            leeway=CLOCK_SKEW_SECONDS,
+            options={"require": ["exp", "iat", "iss", "aud", "sub"]},
+        )
+    except jwt.InvalidAudienceError as exc:
+        raise ValueError("Google token audience mismatch.") from exc
+    except jwt.PyJWTError as exc:
+        raise ValueError("Invalid Google token.") from exc
+
+    if payload.get("iss") not in GOOGLE_ISSUERS:
+        raise ValueError("Invalid Google token issuer.")
+    if str(payload.get("email_verified")).lower() != "true":
+        raise ValueError("Google email is not verified.")
+    return payload
@@ -0,0 +1,68 @@
+import time
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+from apiApp.models import Product
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Command(BaseCommand):
+    help = "Compare cart storage backends on an add/update/detail/delete workload."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--backend",
+            action="append",
+            choices=sorted(settings.CART_STORAGE_ALIASES),
+            help="Backend to run; repeat for several. Defaults to all of them.",
+        )
+        parser.add_argument("--carts", type=int, default=200)
+        parser.add_argument("--items", type=int, default=5, help="Distinct products added per cart.")
+
+    def handle(self, *args, **options):
+        products = list(Product.objects.order_by("id")[:options["items"]])
+        if not products:
+            raise CommandError("Add some products before benchmarking carts.")
+
+        for name in options["backend"] or sorted(settings.CART_STORAGE_ALIASES):
+            storage = import_string(settings.CART_STORAGE_ALIASES[name])()
+            timings = self._run(storage, products, options["carts"])
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            for op, samples in timings.items():
+                total = sum(samples)
+                self.stdout.write(
+                    f"  {op:<8} {len(samples):>6} ops  {len(samples) / total:>9.0f} ops/s  "
+                    f"p50 {_percentile(samples, 0.5) * 1000:.2f} ms  "
+                    f"p99 {_percentile(samples, 0.99) * 1000:.2f} ms"
+                )
+
+    def _run(self, storage, products, carts):
+        timings = {"add": [], "detail": [], "update": [], "delete": []}
+
+        def timed(op, call, *args):
+            started = time.perf_counter()
+            result = call(*args)
+            timings[op].append(time.perf_counter() - started)
+            return result
+
+        codes = [f"bench-{uuid.uuid4().hex[:12]}" for _ in range(carts)]
+        try:
+            for code in codes:
+                for product in products:
+                    timed("add", storage.add, code, product)
+                timed("add", storage.add, code, products[0])
+                items = timed("detail", storage.detail, code)["cartitems"]
+                timed("update", storage.update_item, items[0]["id"], 3, code)
+                timed("delete", storage.delete_item, items[-1]["id"], code)
+                timed("detail", storage.detail, code)
+        finally:
+            for code in codes:
+                storage.discard(code)
+        return timings
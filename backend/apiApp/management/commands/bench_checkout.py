@@ -0,0 +1,140 @@
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+
+from apiApp.models import EmailOutbox, Order, PaymentEvent, Product
+from apiApp.payments import FakeGateway, get_payment_gateway
+
+
+STEPS = ["add_to_cart", "checkout", "webhook", "finalize"]
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the card checkout funnel (add to cart, checkout, webhook, finalize) with "
+        "concurrent virtual users against the fake payment gateway and report latencies."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=8, help="Concurrent virtual users.")
+        parser.add_argument("--checkouts", type=int, default=500, help="Total checkouts to run.")
+        parser.add_argument("--items", type=int, default=3, help="Products added to each cart.")
+        parser.add_argument("--keep", action="store_true", help="Keep the orders, events and emails created.")
+
+    def handle(self, *args, **options):
+        gateway = get_payment_gateway()
+        if not isinstance(gateway, FakeGateway):
+            raise CommandError("Set PAYMENT_GATEWAY=fake; this command must not create real Stripe sessions.")
+        product_ids = list(Product.objects.order_by("id").values_list("id", flat=True)[:options["items"]])
+        if not product_ids:
+            raise CommandError("Add some products before benchmarking checkout.")
+
+        run = uuid.uuid4().hex[:8]
+        email = f"bench-{run}@example.com"
+        timings = {step: [] for step in STEPS}
+        errors = []
+        remaining = [options["checkouts"]]
+        lock = threading.Lock()
+
+        def record(step, started, response, expected=200):
+            elapsed = time.perf_counter() - started
+            with lock:
+                timings[step].append(elapsed)
+            if response.status_code != expected:
+                raise RuntimeError(f"{step} returned {response.status_code}")
+
+        def checkout(client):
+            cart_code = f"bench-{run}-{uuid.uuid4().hex[:12]}"
+            for product_id in product_ids:
+                started = time.perf_counter()
+                response = client.post(
+                    "/add_to_cart/",
+                    {"cart_code": cart_code, "product_id": product_id, "mode": "delta"},
+                    content_type="application/json",
+                )
+                record("add_to_cart", started, response)
+
+            started = time.perf_counter()
+            response = client.post(
+                "/checkout/",
+                {
+                    "cart_code": cart_code,
+                    "email": email,
+                    "buyer_name": "Load Test",
+                    "address_line": "1 Bench Street",
+                    "city": "Chennai",
+                    "country": "IN",
+                    "payment_method": "CARD",
+                },
+                content_type="application/json",
+            )
+            record("checkout", started, response)
+            session_id = response.json()["data"]["id"]
+
+            payload, signature = gateway.webhook(session_id)
+            started = time.perf_counter()
+            response = client.post(
+                "/webhook/", payload, content_type="application/json", HTTP_STRIPE_SIGNATURE=signature
+            )
+            record("webhook", started, response)
+
+            started = time.perf_counter()
+            response = client.post(
+                "/checkout/finalize/", {"session_id": session_id}, content_type="application/json"
+            )
+            record("finalize", started, response)
+
+        def user():
+            client = Client()
+            try:
+                while True:
+                    with lock:
+                        if not remaining[0]:
+                            return
+                        remaining[0] -= 1
+                    try:
+                        checkout(client)
+                    except Exception as exc:
+                        with lock:
+                            errors.append(str(exc))
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=user) for _ in range(options["users"])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        completed = len(timings["finalize"])
+        self.stdout.write(
+            f"{completed} checkouts in {elapsed:.1f}s ({completed / elapsed * 60:.0f}/min), "
+            f"{len(errors)} errors, gateway latency {settings.PAYMENT_GATEWAY_LATENCY_MS} ms"
+        )
+        for step in STEPS:
+            samples = timings[step]
+            if samples:
+                self.stdout.write(
+                    f"  {step:<12} {len(samples):>6}  p50 {_percentile(samples, 0.5) * 1000:7.2f} ms  "
+                    f"p95 {_percentile(samples, 0.95) * 1000:7.2f} ms  "
+                    f"p99 {_percentile(samples, 0.99) * 1000:7.2f} ms"
+                )
+        for message in sorted(set(errors))[:5]:
+            self.stdout.write(self.style.WARNING(f"  {message}"))
+
+        if not options["keep"]:
+            PaymentEvent.objects.filter(payload__data__object__customer_email=email).delete()
+            EmailOutbox.objects.filter(to=email).delete()
+            Order.objects.filter(customer_email=email).delete()
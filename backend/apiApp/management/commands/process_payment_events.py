@@ -0,0 +1,40 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apiApp.payment_events import HANDLED_EVENT_TYPES, claim_events, process_events
+from apiApp.views import handle_checkout_event
+
+
+class Command(BaseCommand):
+    help = "Apply stored Stripe webhook events (order fulfillment) in the order they were received."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=settings.PAYMENT_EVENT_BATCH_SIZE)
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling for new events instead of exiting once none are due.",
+        )
+        parser.add_argument("--interval", type=float, default=1.0, help="Seconds to sleep when idle in --loop mode.")
+
+    def handle(self, *args, **options):
+        handlers = {event_type: handle_checkout_event for event_type in HANDLED_EVENT_TYPES}
+        total_processed = total_failed = 0
+        while True:
+            events = claim_events(options["batch_size"])
+            if events:
+                processed, failed = process_events(events, handlers)
+                total_processed += processed
+                total_failed += failed
+                if options["verbosity"] > 1:
+                    self.stdout.write(f"Processed {processed}, failed {failed}.")
+                continue
+            if not options["loop"]:
+                break
+            close_old_connections()
+            time.sleep(options["interval"])
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {total_processed} events, {total_failed} failed attempts."))
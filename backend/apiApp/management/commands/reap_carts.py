@@ -0,0 +1,50 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from apiApp.models import Cart
+
+
+class Command(BaseCommand):
+    help = "Delete carts that have been idle longer than CART_IDLE_TTL_DAYS, in small batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=settings.CART_IDLE_TTL_DAYS)
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.05,
+            help="Seconds to sleep between batches so writers can grab the database lock.",
+        )
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        idle = Cart.objects.filter(updated_at__lt=cutoff)
+
+        if options["dry_run"]:
+            self.stdout.write(f"{idle.count()} carts idle since before {cutoff:%Y-%m-%d %H:%M} would be deleted.")
+            return
+
+        deleted = 0
+        last_id = 0
+        while True:
+            ids = list(
+                idle.filter(id__gt=last_id).order_by("id").values_list("id", flat=True)[:options["batch_size"]]
+            )
+            if not ids:
+                break
+            last_id = ids[-1]
+            # one short transaction per batch; re-check the cutoff in case a cart was touched meanwhile
+            with transaction.atomic():
+                _, per_model = idle.filter(id__in=ids).delete()
+            deleted += per_model.get(Cart._meta.label, 0)
+            if options["pause"]:
+                time.sleep(options["pause"])
+
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} idle carts."))
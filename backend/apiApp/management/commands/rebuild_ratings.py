@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from apiApp.models import CatalogVersion
+from apiApp.ratings import rebuild_product_ratings
+
+
+class Command(BaseCommand):
+    help = "Recompute every product's stored rating sum, review count and average from its reviews."
+
+    def handle(self, *args, **options):
+        rated = rebuild_product_ratings()
+        CatalogVersion.bump()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt ratings for {rated} reviewed products."))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from apiApp.search import INDEX_BATCH_SIZE, get_search_backend, rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the product full-text and trigram search indexes from the Product and Category tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=INDEX_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        indexed = rebuild_index(batch_size=options["batch_size"])
+        backend = type(get_search_backend()).__name__
+        self.stdout.write(
+            self.style.SUCCESS(f"Indexed {indexed} products with {backend} and the trigram index.")
+        )
@@ -0,0 +1,38 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apiApp.outbox import claim_batch, send_batch
+
+
+class Command(BaseCommand):
+    help = "Send queued transactional emails in batches over one SMTP connection per batch."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=settings.EMAIL_OUTBOX_BATCH_SIZE)
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling for new emails instead of exiting once the outbox is drained.",
+        )
+        parser.add_argument("--interval", type=float, default=2.0, help="Seconds to sleep when idle in --loop mode.")
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            rows = claim_batch(options["batch_size"])
+            if rows:
+                sent, failed = send_batch(rows)
+                total_sent += sent
+                total_failed += failed
+                if options["verbosity"] > 1:
+                    self.stdout.write(f"Sent {sent}, failed {failed}.")
+                continue
+            if not options["loop"]:
+                break
+            close_old_connections()
+            time.sleep(options["interval"])
+
+        self.stdout.write(self.style.SUCCESS(f"Sent {total_sent} emails, {total_failed} failed attempts."))
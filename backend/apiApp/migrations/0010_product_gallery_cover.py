@@ -0,0 +1,29 @@
+# Generated by Django 6.0.2 on 2026-10-18 05:28
+
+from django.db import migrations, models
+
+
+def backfill_gallery_cover(apps, schema_editor):
+    Product = apps.get_model('apiApp', 'Product')
+    ProductImage = apps.get_model('apiApp', 'ProductImage')
+    covers = {}
+    for product_id, image in ProductImage.objects.order_by('position', 'id').values_list('product_id', 'image'):
+        covers.setdefault(product_id, image)
+    for product_id, image in covers.items():
+        Product.objects.filter(pk=product_id).update(gallery_cover=image)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apiApp', '0009_product_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='gallery_cover',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='Product_imges'),
+        ),
+        migrations.RunPython(backfill_gallery_cover, migrations.RunPython.noop),
+    ]
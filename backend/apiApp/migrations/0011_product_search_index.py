@@ -0,0 +1,54 @@
+# Generated by Django 6.0.2 on 2026-10-18 05:28
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS apiapp_product_fts USING fts5("
+            "name, description, category, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            "INSERT INTO apiapp_product_fts (rowid, name, description, category) "
+            "SELECT p.id, p.name, p.description, COALESCE(c.name, '') "
+            "FROM apiApp_product p LEFT JOIN apiApp_category c ON c.id = p.category_id"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE TABLE IF NOT EXISTS apiapp_product_search ("
+            "product_id bigint PRIMARY KEY REFERENCES \"apiApp_product\" (id) ON DELETE CASCADE "
+            "DEFERRABLE INITIALLY DEFERRED, document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS apiapp_product_search_document_idx "
+            "ON apiapp_product_search USING GIN (document)"
+        )
+        schema_editor.execute(
+            "INSERT INTO apiapp_product_search (product_id, document) "
+            "SELECT p.id, "
+            "setweight(to_tsvector('english', p.name), 'A') "
+            "|| setweight(to_tsvector('english', COALESCE(c.name, '')), 'B') "
+            "|| setweight(to_tsvector('english', p.description), 'C') "
+            "FROM \"apiApp_product\" p LEFT JOIN \"apiApp_category\" c ON c.id = p.category_id"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS apiapp_product_fts")
+    elif vendor == 'postgresql':
+        schema_editor.execute("DROP TABLE IF EXISTS apiapp_product_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apiApp', '0010_product_gallery_cover'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 6.0.2 on 2026-10-18 05:29
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+BATCH_SIZE = 1000
+
+
+def _trigrams(text):
+    # frozen copy of apiApp.search.trigrams as of this migration
+    grams = set()
+    for word in re.findall(r"\w+", (text or "").lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def backfill_trigrams(apps, schema_editor):
+    Product = apps.get_model('apiApp', 'Product')
+    ProductTrigram = apps.get_model('apiApp', 'ProductTrigram')
+    entries = []
+    for pk, name, category in Product.objects.values_list('id', 'name', 'category__name').iterator():
+        for source, text in (('name', name), ('category', category)):
+            grams = _trigrams(text)
+            entries.extend(
+                ProductTrigram(product_id=pk, source=source, trigram=gram, total=len(grams))
+                for gram in grams
+            )
+        if len(entries) >= BATCH_SIZE:
+            ProductTrigram.objects.bulk_create(entries, batch_size=BATCH_SIZE)
+            entries = []
+    ProductTrigram.objects.bulk_create(entries, batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apiApp', '0011_product_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('name', 'Product name'), ('category', 'Category name')], max_length=10)),
+                ('trigram', models.CharField(max_length=3)),
+                ('total', models.PositiveSmallIntegerField()),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trigrams', to='apiApp.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['trigram', 'product', 'source', 'total'], name='trigram_lookup_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_trigrams, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 6.0.2 on 2026-10-18 05:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apiApp', '0012_producttrigram'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['featured', 'price', 'id'], name='product_featured_price_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productrating',
+            index=models.Index(fields=['average_rating', 'product'], name='rating_avg_product_idx'),
+        ),
+    ]
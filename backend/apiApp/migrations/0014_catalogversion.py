@@ -0,0 +1,27 @@
+# Generated by Django 6.0.2 on 2026-10-18 05:32
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def create_catalog_version(apps, schema_editor):
+    CatalogVersion = apps.get_model('apiApp', 'CatalogVersion')
+    CatalogVersion.objects.get_or_create(pk=1)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apiApp', '0013_catalog_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=1)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.RunPython(create_catalog_version, migrations.RunPython.noop),
+    ]
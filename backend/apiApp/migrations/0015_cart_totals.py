@@ -0,0 +1,40 @@
+# Generated by Django 6.0.2 on 2026-10-18 05:33
+
+from django.db import migrations, models
+from django.db.models import DecimalField, ExpressionWrapper, F, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_cart_totals(apps, schema_editor):
+    Cart = apps.get_model('apiApp', 'Cart')
+    CartItem = apps.get_model('apiApp', 'CartItem')
+    items = CartItem.objects.filter(cart=OuterRef('pk')).order_by().values('cart')
+    quantity = items.annotate(total=Sum('quantity')).values('total')
+    amount = items.annotate(
+        total=Sum(ExpressionWrapper(F('quantity') * F('product__price'), output_field=DecimalField()))
+    ).values('total')
+    Cart.objects.update(
+        total_quantity=Coalesce(Subquery(quantity, output_field=IntegerField()), Value(0)),
+        subtotal=Coalesce(Subquery(amount, output_field=DecimalField()), Value(0), output_field=DecimalField()),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apiApp', '0014_catalogversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='subtotal',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='cart',
+            name='total_quantity',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_cart_totals, migrations.RunPython.noop),
+    ]
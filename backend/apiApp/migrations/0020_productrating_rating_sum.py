@@ -0,0 +1,33 @@
+# Generated by Django 6.0.2 on 2026-10-18 05:49
+
+from django.db import migrations, models
+from django.db.models import IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_rating_sum(apps, schema_editor):
+    ProductRating = apps.get_model('apiApp', 'ProductRating')
+    Review = apps.get_model('apiApp', 'Review')
+    total = (
+        Review.objects.filter(product=OuterRef('product')).order_by().values('product')
+        .annotate(total=Sum('rating')).values('total')
+    )
+    ProductRating.objects.update(
+        rating_sum=Coalesce(Subquery(total, output_field=IntegerField()), Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apiApp', '0019_paymentevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productrating',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_rating_sum, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 6.0.2 on 2026-10-18 05:50
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_histogram(apps, schema_editor):
+    ProductRating = apps.get_model('apiApp', 'ProductRating')
+    Review = apps.get_model('apiApp', 'Review')
+    counts = {}
+    for stars in range(1, 6):
+        count = (
+            Review.objects.filter(product=OuterRef('product'), rating=stars).order_by().values('product')
+            .annotate(total=Count('id')).values('total')
+        )
+        counts[f'stars_{stars}'] = Coalesce(Subquery(count, output_field=IntegerField()), Value(0))
+    ProductRating.objects.update(**counts)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apiApp', '0020_productrating_rating_sum'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productrating',
+            name='stars_1',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='productrating',
+            name='stars_2',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='productrating',
+            name='stars_3',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='productrating',
+            name='stars_4',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='productrating',
+            name='stars_5',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_histogram, migrations.RunPython.noop),
+    ]
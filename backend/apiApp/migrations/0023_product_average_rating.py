@@ -0,0 +1,44 @@
+# Generated by Django 6.0.2 on 2026-10-18 06:00
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_average_rating(apps, schema_editor):
+    Product = apps.get_model('apiApp', 'Product')
+    ProductRating = apps.get_model('apiApp', 'ProductRating')
+    average = ProductRating.objects.filter(product=OuterRef('pk')).values('average_rating')[:1]
+    Product.objects.update(average_rating=Coalesce(Subquery(average), Value(0.0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apiApp', '0022_review_product_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='productrating',
+            name='rating_avg_product_idx',
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='average_rating',
+            field=models.FloatField(default=0.0, editable=False),
+        ),
+        migrations.RunPython(backfill_average_rating, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['average_rating', 'id'], name='product_rating_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['category', 'average_rating', 'id'], name='product_cat_rating_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['featured', 'average_rating', 'id'], name='product_featured_rating_id_idx'),
+        ),
+    ]
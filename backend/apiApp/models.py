@@ -4,6 +4,7 @@ from django.utils.text import slugify
 from MadstoreApi import settings
 import uuid
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 
 class CustomUser(AbstractUser):
     email = models.EmailField(unique=True)
@@ -40,6 +41,26 @@ class Product(models.Model):
     image = models.ImageField(upload_to='Product_imges', blank=True , null=True)
     featured = models.BooleanField(default=True)
     category = models.ForeignKey(Category , on_delete=models.SET_NULL , related_name='Product' ,blank=True , null=True)
+    # first gallery image, kept in sync by the ProductImage signals so list
+    # serializers can fall back to it without querying the gallery per row
+    gallery_cover = models.ImageField(upload_to='Product_imges', blank=True, null=True, editable=False)
+    # copy of ProductRating.average_rating (0 when unreviewed) kept by apiApp.ratings,
+    # so the rating sort and filter run on an index instead of a join
+    average_rating = models.FloatField(default=0.0, editable=False)
+
+    # maintained with update() by signals; a plain save() of an instance loaded
+    # earlier must not write back the stale values it holds
+    DENORMALIZED_FIELDS = ["gallery_cover", "average_rating"]
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["price", "id"], name="product_price_id_idx"),
+            models.Index(fields=["category", "price", "id"], name="product_cat_price_id_idx"),
+            models.Index(fields=["featured", "price", "id"], name="product_featured_price_id_idx"),
+            models.Index(fields=["average_rating", "id"], name="product_rating_id_idx"),
+            models.Index(fields=["category", "average_rating", "id"], name="product_cat_rating_id_idx"),
+            models.Index(fields=["featured", "average_rating", "id"], name="product_featured_rating_id_idx"),
+        ]
 
     def __str__(self):
         return self.name
@@ -54,13 +75,42 @@ class Product(models.Model):
                 unique_slug = f"{self.slug}-{counter}"
                 counter += 1
             self.slug = unique_slug
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.DENORMALIZED_FIELDS
+            ]
         super().save(*args, **kwargs)
 
 
+class ProductTrigram(models.Model):
+    SOURCE_CHOICES = [
+        ("name", "Product name"),
+        ("category", "Category name"),
+    ]
+
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="trigrams")
+    source = models.CharField(max_length=10, choices=SOURCE_CHOICES)
+    trigram = models.CharField(max_length=3)
+    # number of distinct trigrams in the indexed text, used for similarity scoring
+    total = models.PositiveSmallIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["trigram", "product", "source", "total"], name="trigram_lookup_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.trigram!r} in {self.source} of product {self.product_id}"
+
+
 class Cart(models.Model):
     cart_code = models.CharField(max_length=15, unique=True)
+    # running totals kept in step with CartItem writes by apiApp.carts
+    total_quantity = models.PositiveIntegerField(default=0)
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.cart_code
@@ -70,6 +120,9 @@ class CartItem(models.Model):
     product = models.ForeignKey(Product , on_delete=models.CASCADE , related_name="item")
     quantity = models.IntegerField(default=1)
 
+    class Meta:
+        unique_together = ["cart", "product"]
+
     def __str__(self):
         return f"{self.quantity} x {self.product.name} in cart {self.cart.cart_code}"
     
@@ -97,12 +150,29 @@ class Review(models.Model):
     class Meta:
         unique_together = ["user", "product"]
         ordering = ["-created"]
+        indexes = [
+            # keyset pages of product_reviews for the "newest" and "rating" sorts
+            models.Index(fields=["product", "created", "id"], name="review_product_created_idx"),
+            models.Index(fields=["product", "rating", "created", "id"], name="review_product_rating_idx"),
+        ]
 
     
 class ProductRating(models.Model):
     product = models.OneToOneField(Product , on_delete=models.CASCADE , related_name="rating")
+    # rating_sum / total_reviews; mirrored on Product.average_rating for catalog queries
     average_rating = models.FloatField(default=0.0) 
     total_reviews = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    # number of reviews per star value, kept in step with the sum and count
+    stars_1 = models.PositiveIntegerField(default=0)
+    stars_2 = models.PositiveIntegerField(default=0)
+    stars_3 = models.PositiveIntegerField(default=0)
+    stars_4 = models.PositiveIntegerField(default=0)
+    stars_5 = models.PositiveIntegerField(default=0)
+
+    @property
+    def histogram(self):
+        return [{"stars": stars, "count": getattr(self, f"stars_{stars}")} for stars in range(5, 0, -1)]
 
     def __str__(self):
         return f"{self.product.name} - {self.average_rating} ({self.total_reviews} reviews)"
@@ -209,3 +279,84 @@ class Carousel(models.Model):
 
     def __str__(self):
         return self.title or f"Carousel {self.id}"
+
+
+class CatalogVersion(models.Model):
+    # single row, bumped whenever catalog data changes; drives ETags for the read-only catalog views
+    version = models.PositiveBigIntegerField(default=1)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    @classmethod
+    def current(cls):
+        state = cls.objects.filter(pk=1).values_list("version", "updated_at").first()
+        if state is None:
+            row, _ = cls.objects.get_or_create(pk=1)
+            state = (row.version, row.updated_at)
+        return state
+
+    @classmethod
+    def bump(cls):
+        now = timezone.now()
+        if not cls.objects.filter(pk=1).update(version=models.F("version") + 1, updated_at=now):
+            cls.objects.get_or_create(pk=1, defaults={"updated_at": now})
+
+    def __str__(self):
+        return f"Catalog v{self.version}"
+
+
+class EmailOutbox(models.Model):
+    # transactional mail is written here in the request's transaction and sent by `manage.py send_outbox`
+    STATUS_CHOICES = [
+        ("Pending", "Pending"),
+        ("Sent", "Sent"),
+        ("Failed", "Failed"),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    content_subtype = models.CharField(max_length=20, default="html")
+    from_email = models.CharField(max_length=255)
+    to = models.EmailField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="Pending")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claim_token = models.CharField(max_length=32, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="outbox_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to} ({self.status})"
+
+
+class PaymentEvent(models.Model):
+    # verified Stripe webhook events, stored by the webhook and processed by `manage.py process_payment_events`
+    STATUS_CHOICES = [
+        ("Pending", "Pending"),
+        ("Processed", "Processed"),
+        ("Failed", "Failed"),
+    ]
+
+    event_id = models.CharField(max_length=255, unique=True)
+    type = models.CharField(max_length=100)
+    payload = models.JSONField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="Pending")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claim_token = models.CharField(max_length=32, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="payment_event_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.type} {self.event_id} ({self.status})"
@@ -0,0 +1,112 @@
+import logging
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F
+from django.utils import timezone
+
+from .models import EmailOutbox
+
+
+logger = logging.getLogger(__name__)
+
+
+def queue_email(subject, body, to, from_email, content_subtype="html"):
+    # call inside the transaction that creates whatever the email is about
+    return EmailOutbox.objects.create(
+        subject=subject,
+        body=body,
+        content_subtype=content_subtype,
+        from_email=from_email,
+        to=to,
+    )
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=settings.EMAIL_OUTBOX_RETRY_SECONDS * 2 ** (attempts - 1))
+
+
+def claim_batch(batch_size):
+    """Lease up to ``batch_size`` due emails to this worker.
+
+    The conditional UPDATE only takes rows that are still due, so two workers
+    racing for the same ids split them instead of both sending. The lease moves
+    ``next_attempt_at`` forward; if the worker dies the rows come due again.
+    """
+    now = timezone.now()
+    due = EmailOutbox.objects.filter(status="Pending", next_attempt_at__lte=now)
+    ids = list(due.order_by("next_attempt_at", "id").values_list("id", flat=True)[:batch_size])
+    if not ids:
+        return []
+    token = uuid.uuid4().hex
+    due.filter(id__in=ids).update(
+        claim_token=token,
+        attempts=F("attempts") + 1,
+        next_attempt_at=now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS),
+    )
+    return list(EmailOutbox.objects.filter(claim_token=token).order_by("id"))
+
+
+def _message(row, connection):
+    message = EmailMessage(
+        subject=row.subject,
+        body=row.body,
+        from_email=row.from_email,
+        to=[row.to],
+        connection=connection,
+    )
+    message.content_subtype = row.content_subtype
+    return message
+
+
+def send_batch(rows):
+    """Send claimed rows over one SMTP connection and record each outcome.
+
+    Returns ``(sent, failed)``. A failed row is rescheduled with exponential
+    backoff until EMAIL_OUTBOX_MAX_ATTEMPTS, then marked Failed.
+    """
+    if not rows:
+        return 0, 0
+    sent, failed = [], []
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+        for row in rows:
+            # one message per call so a rejected recipient does not fail the rest of the batch
+            try:
+                connection.send_messages([_message(row, connection)])
+            except Exception as exc:
+                logger.warning("Sending outbox email %s failed: %s", row.id, exc)
+                row.last_error = str(exc)
+                failed.append(row)
+            else:
+                sent.append(row.id)
+    except Exception as exc:
+        # could not connect at all: every unsent row counts as a failed attempt
+        logger.warning("Could not open mail connection: %s", exc)
+        done = set(sent) | {row.id for row in failed}
+        for row in rows:
+            if row.id not in done:
+                row.last_error = str(exc)
+                failed.append(row)
+    finally:
+        connection.close()
+
+    now = timezone.now()
+    if sent:
+        EmailOutbox.objects.filter(id__in=sent).update(
+            status="Sent", sent_at=now, claim_token="", last_error=""
+        )
+    for row in failed:
+        row.claim_token = ""
+        if row.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+            row.status = "Failed"
+        else:
+            row.next_attempt_at = now + retry_delay(row.attempts)
+    if failed:
+        EmailOutbox.objects.bulk_update(
+            failed, ["status", "next_attempt_at", "claim_token", "last_error"]
+        )
+    return len(sent), len(failed)
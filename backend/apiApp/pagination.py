@@ -0,0 +1,106 @@
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+PRODUCT_SORTS = {
+    "default": ["id"],
+    "newest": ["-id"],
+    "price": ["price", "id"],
+    "-price": ["-price", "-id"],
+    "rating": ["-average_rating", "-id"],
+}
+
+REVIEW_SORTS = {
+    "newest": ["-created", "-id"],
+    "rating": ["-rating", "-created", "-id"],
+}
+
+
+class CursorError(ValueError):
+    pass
+
+
+def encode_cursor(sort, values):
+    raw = json.dumps({"s": sort, "v": values}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, sort):
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise CursorError("Invalid cursor.") from exc
+
+    if not isinstance(data, dict) or data.get("s") != sort or not isinstance(data.get("v"), list):
+        raise CursorError("Cursor does not match the requested sort.")
+    return data["v"]
+
+
+def get_page_size(request):
+    default = settings.CATALOG_PAGE_SIZE
+    try:
+        size = int(request.query_params.get("page_size", default))
+    except (TypeError, ValueError):
+        raise CursorError("page_size must be a number.")
+    if size < 1:
+        raise CursorError("page_size must be at least 1.")
+    return min(size, settings.CATALOG_MAX_PAGE_SIZE)
+
+
+def _keyset_filter(ordering, values):
+    # (a, b) > (x, y)  ==>  a > x OR (a = x AND b > y), honouring per-key direction
+    condition = Q()
+    equal = Q()
+    for field, value in zip(ordering, values):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+        condition |= equal & Q(**{f"{name}__{lookup}": value})
+        equal &= Q(**{name: value})
+    return condition
+
+
+def _cursor_value(value):
+    if isinstance(value, (int, float, str)) or value is None:
+        return value
+    return str(value)
+
+
+def paginate_queryset(queryset, request, sort="default", sorts=PRODUCT_SORTS):
+    """Keyset-paginate ``queryset`` and return ``(rows, next_cursor)``.
+
+    The cursor holds the sort key values of the last row, so every page is a
+    single indexed range scan regardless of how deep the client has paged.
+    """
+    if sort not in sorts:
+        raise CursorError(f"Unknown sort '{sort}'.")
+    ordering = sorts[sort]
+    page_size = get_page_size(request)
+
+    queryset = queryset.order_by(*ordering)
+    cursor = request.query_params.get("cursor")
+    if cursor:
+        values = decode_cursor(cursor, sort)
+        if len(values) != len(ordering):
+            raise CursorError("Invalid cursor.")
+        try:
+            queryset = queryset.filter(_keyset_filter(ordering, values))
+        except (ValueError, TypeError, ValidationError) as exc:
+            # a well-formed cursor carrying values of the wrong type for the sort keys
+            raise CursorError("Invalid cursor.") from exc
+
+    rows = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            sort,
+            [_cursor_value(getattr(last, field.lstrip("-"))) for field in ordering],
+        )
+    return rows, next_cursor
@@ -0,0 +1,77 @@
+import logging
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import PaymentEvent
+
+
+logger = logging.getLogger(__name__)
+
+HANDLED_EVENT_TYPES = {
+    "checkout.session.completed",
+    "checkout.session.async_payment_succeeded",
+}
+
+
+def record_event(event):
+    # one INSERT ... ON CONFLICT DO NOTHING: Stripe retries of an event we already have are dropped
+    PaymentEvent.objects.bulk_create(
+        [PaymentEvent(event_id=event["id"], type=event["type"], payload=event)],
+        ignore_conflicts=True,
+    )
+
+
+def claim_events(batch_size):
+    # same leased, conditional claim as outbox.claim_batch; rows come back oldest first
+    now = timezone.now()
+    due = PaymentEvent.objects.filter(status="Pending", next_attempt_at__lte=now)
+    ids = list(due.order_by("id").values_list("id", flat=True)[:batch_size])
+    if not ids:
+        return []
+    token = uuid.uuid4().hex
+    due.filter(id__in=ids).update(
+        claim_token=token,
+        attempts=F("attempts") + 1,
+        next_attempt_at=now + timedelta(seconds=settings.PAYMENT_EVENT_LEASE_SECONDS),
+    )
+    return list(PaymentEvent.objects.filter(claim_token=token).order_by("id"))
+
+
+def process_events(events, handlers):
+    """Run ``handlers[event.type](payload)`` for each claimed event, in order.
+
+    The handler and the status change commit together, so an event is either
+    fully applied and marked Processed or rolled back and retried with backoff.
+    Returns ``(processed, failed)``.
+    """
+    processed = failed = 0
+    for event in events:
+        handler = handlers.get(event.type)
+        try:
+            with transaction.atomic():
+                if handler is not None:
+                    handler(event.payload)
+                event.status = "Processed"
+                event.processed_at = timezone.now()
+                event.claim_token = ""
+                event.last_error = ""
+                event.save(update_fields=["status", "processed_at", "claim_token", "last_error"])
+            processed += 1
+        except Exception as exc:
+            logger.exception("Processing payment event %s failed", event.event_id)
+            event.claim_token = ""
+            event.last_error = str(exc)
+            if event.attempts >= settings.PAYMENT_EVENT_MAX_ATTEMPTS:
+                event.status = "Failed"
+            else:
+                event.next_attempt_at = timezone.now() + timedelta(
+                    seconds=settings.PAYMENT_EVENT_RETRY_SECONDS * 2 ** (event.attempts - 1)
+                )
+            event.save(update_fields=["status", "next_attempt_at", "claim_token", "last_error"])
+            failed += 1
+    return processed, failed
@@ -0,0 +1,152 @@
+import hashlib
+import hmac
+import json
+import threading
+import time
+import uuid
+
+import stripe  # type: ignore
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class WebhookSignatureError(Exception):
+    pass
+
+
+class PaymentGateway:
+    """What the checkout views need from a payment provider.
+
+    Sessions and events are returned as plain mappings shaped like Stripe's
+    (``id``, ``url``, ``metadata``, ``amount_total``...), so order fulfillment
+    does not care which gateway produced them.
+    """
+
+    def create_checkout_session(self, **params):
+        raise NotImplementedError
+
+    def retrieve_checkout_session(self, session_id):
+        raise NotImplementedError
+
+    def construct_event(self, payload, signature):
+        # raises ValueError for a malformed payload, WebhookSignatureError for a bad signature
+        raise NotImplementedError
+
+
+class StripeGateway(PaymentGateway):
+
+    def __init__(self):
+        stripe.api_key = settings.STRIPE_SECRET_KEY
+
+    def create_checkout_session(self, **params):
+        return stripe.checkout.Session.create(**params)
+
+    def retrieve_checkout_session(self, session_id):
+        return stripe.checkout.Session.retrieve(session_id)
+
+    def construct_event(self, payload, signature):
+        try:
+            return stripe.Webhook.construct_event(payload, signature, settings.WEB_HOOK_SECRET_KEY)
+        except stripe.error.SignatureVerificationError as exc:
+            raise WebhookSignatureError(str(exc)) from exc
+
+
+class FakeGateway(PaymentGateway):
+    """In-process stand-in for Stripe Checkout, for load tests and local runs.
+
+    Sessions live in this process only, so run a single worker. Every call
+    sleeps PAYMENT_GATEWAY_LATENCY_MS to imitate the network round trip.
+    ``webhook`` mints a ``checkout.session.completed`` payload signed with
+    Stripe's ``t=...,v1=...`` scheme, which ``construct_event`` verifies.
+    """
+
+    tolerance = 300
+
+    def __init__(self):
+        self.latency = settings.PAYMENT_GATEWAY_LATENCY_MS / 1000
+        self.secret = settings.WEB_HOOK_SECRET_KEY or "whsec_fake"
+        self._lock = threading.Lock()
+        self._sessions = {}
+
+    def _wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def create_checkout_session(self, **params):
+        self._wait()
+        session_id = f"cs_fake_{uuid.uuid4().hex}"
+        line_items = params.get("line_items", [])
+        session = {
+            "id": session_id,
+            "object": "checkout.session",
+            "url": params.get("success_url", "").replace("{CHECKOUT_SESSION_ID}", session_id),
+            "customer_email": params.get("customer_email"),
+            "currency": line_items[0]["price_data"]["currency"] if line_items else "inr",
+            "amount_total": sum(
+                item["price_data"]["unit_amount"] * item["quantity"] for item in line_items
+            ),
+            "metadata": dict(params.get("metadata") or {}),
+            "payment_status": "unpaid",
+            "status": "open",
+        }
+        with self._lock:
+            self._sessions[session_id] = session
+        return dict(session)
+
+    def retrieve_checkout_session(self, session_id):
+        self._wait()
+        with self._lock:
+            session = self._sessions.get(session_id)
+        if session is None:
+            raise ValueError(f"No such checkout.session: '{session_id}'")
+        return dict(session)
+
+    def pay(self, session_id):
+        with self._lock:
+            session = self._sessions[session_id]
+            session.update(payment_status="paid", status="complete")
+            return dict(session)
+
+    def sign(self, payload, timestamp=None):
+        timestamp = int(timestamp or time.time())
+        digest = hmac.new(
+            self.secret.encode(), f"{timestamp}.{payload}".encode(), hashlib.sha256
+        ).hexdigest()
+        return f"t={timestamp},v1={digest}"
+
+    def webhook(self, session_id, event_type="checkout.session.completed"):
+        # marks the session paid and returns (payload, Stripe-Signature header value)
+        event = {
+            "id": f"evt_fake_{uuid.uuid4().hex}",
+            "object": "event",
+            "type": event_type,
+            "created": int(time.time()),
+            "data": {"object": self.pay(session_id)},
+        }
+        payload = json.dumps(event)
+        return payload, self.sign(payload)
+
+    def construct_event(self, payload, signature):
+        if isinstance(payload, bytes):
+            payload = payload.decode()
+        parts = dict(part.split("=", 1) for part in (signature or "").split(",") if "=" in part)
+        try:
+            timestamp = int(parts.get("t", ""))
+        except ValueError:
+            raise WebhookSignatureError("Unable to extract timestamp from header.")
+        expected = self.sign(payload, timestamp)
+        if not hmac.compare_digest(expected, f"t={timestamp},v1={parts.get('v1', '')}"):
+            raise WebhookSignatureError("No signatures found matching the expected signature.")
+        if abs(time.time() - timestamp) > self.tolerance:
+            raise WebhookSignatureError("Timestamp outside the tolerance zone.")
+        return json.loads(payload)
+
+
+_gateway = None
+
+
+def get_payment_gateway():
+    global _gateway
+    if _gateway is None:
+        _gateway = import_string(settings.PAYMENT_GATEWAY)()
+    return _gateway
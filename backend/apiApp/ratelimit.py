@@ -0,0 +1,107 @@
+import hashlib
+import math
+import re
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.response import Response
+
+
+PERIODS = {"s": 1, "m": 60, "h": 3600}
+
+
+def parse_rate(rate):
+    match = re.fullmatch(r"\s*(\d+)\s*/\s*(\d*)\s*([smh])\s*", rate or "")
+    if not match:
+        raise ValueError(f"Invalid rate '{rate}'; expected e.g. '5/m' or '10/5m'.")
+    tokens, count, unit = match.groups()
+    return int(tokens), int(count or 1) * PERIODS[unit]
+
+
+def client_ip(request):
+    if settings.RATE_LIMIT_TRUST_FORWARDED_FOR:
+        forwarded = request.META.get("HTTP_X_FORWARDED_FOR", "")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def take_token(key, rate, now=None):
+    """Take one token from the bucket ``key``; return 0 or the seconds until one is available.
+
+    The bucket is kept as two cache counters, this period's and the previous
+    period's takes, with the previous one leaking away linearly. That is the
+    sliding-window form of a token bucket: every step is an atomic cache
+    add/incr, so concurrent workers never lose updates and no lock is needed.
+    """
+    capacity, period = parse_rate(rate)
+    cache = caches[settings.RATE_LIMIT_CACHE_ALIAS]
+    now = time.time() if now is None else now
+    window, offset = divmod(now, period)
+    elapsed = offset / period
+    digest = hashlib.sha256(key.encode()).hexdigest()[:32]
+    current_key = f"ratelimit:{digest}:{int(window)}"
+
+    cache.add(current_key, 0, period * 2)
+    try:
+        taken = cache.incr(current_key)
+    except ValueError:
+        # expired between add and incr
+        cache.set(current_key, 1, period * 2)
+        taken = 1
+    previous = cache.get(f"ratelimit:{digest}:{int(window) - 1}", 0)
+
+    level = previous * (1 - elapsed) + taken
+    if level <= capacity:
+        return 0
+
+    # rejected requests do not spend a token
+    cache.decr(current_key)
+    taken -= 1
+    if taken < capacity and previous:
+        # wait for the previous period's takes to leak out
+        return (level - capacity) / previous * period
+    # this period alone used the bucket up: wait into the next one
+    return (1 - elapsed) * period + max(0.0, 1 - (capacity - 1) / max(taken, 1)) * period
+
+
+def throttle(scope, kind, value):
+    """Take a token from the ``<scope>:<kind>`` bucket of ``value``; return a 429 Response or None."""
+    rate = settings.RATE_LIMITS.get(f"{scope}:{kind}")
+    if not rate:
+        return None
+    wait = take_token(f"{scope}:{kind}:{value}", rate)
+    if not wait:
+        return None
+    return Response(
+        {"error": "Too many requests. Please try again later."},
+        status=status.HTTP_429_TOO_MANY_REQUESTS,
+        headers={"Retry-After": str(max(1, math.ceil(wait)))},
+    )
+
+
+def rate_limit(scope, identity=None):
+    """Throttle a DRF function view with the RATE_LIMITS buckets for ``scope``.
+
+    Put it under ``@api_view`` so ``identity(request, *args, **kwargs)`` can
+    read ``request.data``. The per-IP bucket is checked first, then the
+    per-identity one (e.g. the email being logged into) when it returns a value.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            checks = [("ip", client_ip(request))]
+            if identity is not None:
+                value = identity(request, *args, **kwargs)
+                if value:
+                    checks.append(("identity", str(value)))
+            for kind, value in checks:
+                throttled = throttle(scope, kind, value)
+                if throttled:
+                    return throttled
+            return view(request, *args, **kwargs)
+        return wrapped
+    return decorator
@@ -0,0 +1,101 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Exists, F, FloatField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+from .models import Product, ProductRating, Review
+
+
+STAR_VALUES = range(1, 6)
+
+
+def adjust_product_rating(product_id, added=None, removed=None):
+    """Apply a review write to the product's stored rating in one UPDATE.
+
+    ``added`` is the rating that enters the product (create, or the new value
+    of an edit) and ``removed`` the one that leaves it (delete, or the old
+    value). The right-hand side of an UPDATE sees the row before the change,
+    so the average is recomputed from the already-adjusted sum and count in
+    the same statement, then copied to Product.average_rating. Must run in the
+    same transaction as the Review write.
+    """
+    added = int(added) if added is not None else None
+    removed = int(removed) if removed is not None else None
+    sum_delta = (added or 0) - (removed or 0)
+    count_delta = (added is not None) - (removed is not None)
+    star_deltas = {stars: (stars == added) - (stars == removed) for stars in STAR_VALUES}
+
+    rating_sum = F("rating_sum") + sum_delta
+    total_reviews = F("total_reviews") + count_delta
+    updated = ProductRating.objects.filter(product_id=product_id).update(
+        rating_sum=rating_sum,
+        total_reviews=total_reviews,
+        average_rating=Coalesce(
+            Cast(rating_sum, FloatField()) / NullIf(total_reviews, 0), Value(0.0)
+        ),
+        **{
+            f"stars_{stars}": F(f"stars_{stars}") + delta
+            for stars, delta in star_deltas.items()
+            if delta
+        },
+    )
+    if updated:
+        Product.objects.filter(pk=product_id).update(average_rating=Subquery(
+            ProductRating.objects.filter(product_id=product_id).values("average_rating")[:1]
+        ))
+        return
+    if count_delta <= 0:
+        # a delete with no rating row happens when the product itself is being deleted
+        return
+    try:
+        with transaction.atomic():
+            ProductRating.objects.create(
+                product_id=product_id,
+                rating_sum=sum_delta,
+                total_reviews=count_delta,
+                average_rating=sum_delta / count_delta,
+                **{f"stars_{stars}": delta for stars, delta in star_deltas.items() if delta > 0},
+            )
+    except IntegrityError:
+        # another review created the row first
+        adjust_product_rating(product_id, added, removed)
+        return
+    Product.objects.filter(pk=product_id).update(average_rating=sum_delta / count_delta)
+
+
+def rebuild_product_ratings():
+    """Recompute every ProductRating from the reviews with one grouped query.
+
+    Returns the number of products that have reviews.
+    """
+    star_fields = [f"stars_{stars}" for stars in STAR_VALUES]
+    totals = Review.objects.order_by().values("product").annotate(
+        rating_sum=Sum("rating"),
+        total_reviews=Count("id"),
+        **{f"stars_{stars}": Count("id", filter=Q(rating=stars)) for stars in STAR_VALUES},
+    )
+    ratings = [
+        ProductRating(
+            product_id=row["product"],
+            rating_sum=row["rating_sum"],
+            total_reviews=row["total_reviews"],
+            average_rating=row["rating_sum"] / row["total_reviews"],
+            **{field: row[field] for field in star_fields},
+        )
+        for row in totals
+    ]
+    with transaction.atomic():
+        ProductRating.objects.bulk_create(
+            ratings,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=["product"],
+            update_fields=["rating_sum", "total_reviews", "average_rating", *star_fields],
+        )
+        ProductRating.objects.filter(
+            ~Exists(Review.objects.filter(product=OuterRef("product")))
+        ).update(rating_sum=0, total_reviews=0, average_rating=0.0, **{field: 0 for field in star_fields})
+        Product.objects.update(average_rating=Coalesce(
+            Subquery(ProductRating.objects.filter(product=OuterRef("pk")).values("average_rating")[:1]),
+            Value(0.0),
+        ))
+    return len(ratings)
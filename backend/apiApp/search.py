@@ -0,0 +1,261 @@
+import math
+import re
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Max, Q
+from django.utils.module_loading import import_string
+
+from .models import Product, ProductTrigram
+
+
+INDEX_BATCH_SIZE = 1000
+# category-name matches rank below equally good product-name matches
+CATEGORY_TRIGRAM_WEIGHT = 0.8
+
+
+def _terms(query):
+    return re.findall(r"\w+", query.lower())
+
+
+def trigrams(text):
+    # pg_trgm style: each word is padded with two leading and one trailing space
+    grams = set()
+    for word in _terms(text or ""):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _document_rows(products):
+    return products.values_list("id", "name", "description", "category__name")
+
+
+class SearchBackend:
+    def index(self, products):
+        raise NotImplementedError
+
+    def remove(self, product_ids):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def search(self, query, limit, offset=0):
+        raise NotImplementedError
+
+
+class LikeSearchBackend(SearchBackend):
+    # Unindexed fallback for databases without a full-text engine.
+
+    def index(self, products):
+        pass
+
+    def remove(self, product_ids):
+        pass
+
+    def clear(self):
+        pass
+
+    def search(self, query, limit, offset=0):
+        products = Product.objects.filter(
+            Q(name__icontains=query)
+            | Q(description__icontains=query)
+            | Q(category__name__icontains=query)
+        ).order_by("id")
+        return list(products.values_list("id", flat=True)[offset:offset + limit])
+
+
+class SQLiteFTSBackend(SearchBackend):
+    table = "apiapp_product_fts"
+    # bm25() column weights for (name, description, category)
+    weights = (10.0, 1.0, 4.0)
+
+    def index(self, products):
+        rows = list(_document_rows(products))
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {self.table} WHERE rowid = %s", [(row[0],) for row in rows]
+            )
+            cursor.executemany(
+                f"INSERT INTO {self.table} (rowid, name, description, category) VALUES (%s, %s, %s, %s)",
+                [(pk, name, description, category or "") for pk, name, description, category in rows],
+            )
+
+    def remove(self, product_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {self.table} WHERE rowid = %s", [(pk,) for pk in product_ids]
+            )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+
+    def search(self, query, limit, offset=0):
+        terms = _terms(query)
+        if not terms:
+            return []
+        # every term is quoted (no FTS operators from user input) and prefix-matched
+        match = " ".join(f'"{term}"*' for term in terms)
+        weights = ", ".join(str(weight) for weight in self.weights)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s "
+                f"ORDER BY bm25({self.table}, {weights}) LIMIT %s OFFSET %s",
+                [match, limit, offset],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class PostgresSearchBackend(SearchBackend):
+    table = "apiapp_product_search"
+    config = "english"
+
+    def index(self, products):
+        rows = list(_document_rows(products))
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"""
+                INSERT INTO {self.table} (product_id, document)
+                VALUES (
+                    %s,
+                    setweight(to_tsvector('{self.config}', %s), 'A')
+                    || setweight(to_tsvector('{self.config}', %s), 'B')
+                    || setweight(to_tsvector('{self.config}', %s), 'C')
+                )
+                ON CONFLICT (product_id) DO UPDATE SET document = EXCLUDED.document
+                """,
+                [(pk, name, category or "", description) for pk, name, description, category in rows],
+            )
+
+    def remove(self, product_ids):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {self.table} WHERE product_id = ANY(%s)", [list(product_ids)]
+            )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"TRUNCATE {self.table}")
+
+    def search(self, query, limit, offset=0):
+        terms = _terms(query)
+        if not terms:
+            return []
+        tsquery = " & ".join(f"{term}:*" for term in terms)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT product_id FROM {self.table}, to_tsquery('{self.config}', %s) query
+                WHERE document @@ query
+                ORDER BY ts_rank_cd(document, query) DESC, product_id
+                LIMIT %s OFFSET %s
+                """,
+                [tsquery, limit, offset],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+def index_trigrams(products):
+    rows = list(products.values_list("id", "name", "category__name"))
+    ProductTrigram.objects.filter(product_id__in=[row[0] for row in rows]).delete()
+    entries = []
+    for pk, name, category in rows:
+        for source, text in (("name", name), ("category", category)):
+            grams = trigrams(text)
+            entries.extend(
+                ProductTrigram(product_id=pk, source=source, trigram=gram, total=len(grams))
+                for gram in grams
+            )
+    ProductTrigram.objects.bulk_create(entries, batch_size=INDEX_BATCH_SIZE)
+
+
+def trigram_search(query, limit, offset=0):
+    """Return product ids ranked by trigram similarity to ``query``.
+
+    Similarity is the share of the query's trigrams found in the indexed text
+    (close to pg_trgm's word_similarity), ties broken by Jaccard similarity so
+    shorter, tighter names win.
+    """
+    grams = trigrams(query)
+    if not grams:
+        return []
+    threshold = settings.FUZZY_SEARCH_THRESHOLD
+    matches = (
+        ProductTrigram.objects.filter(trigram__in=grams)
+        .values("product_id", "source")
+        .annotate(shared=Count("id"), total=Max("total"))
+        .filter(shared__gte=max(1, math.ceil(threshold * len(grams))))
+    )
+    scores = {}
+    for match in matches:
+        shared = match["shared"]
+        weight = CATEGORY_TRIGRAM_WEIGHT if match["source"] == "category" else 1.0
+        score = (
+            weight * shared / len(grams),
+            weight * shared / (len(grams) + match["total"] - shared),
+        )
+        pk = match["product_id"]
+        if score > scores.get(pk, (0, 0)):
+            scores[pk] = score
+    ranked = sorted(scores, key=lambda pk: (scores[pk], -pk), reverse=True)
+    return ranked[offset:offset + limit]
+
+
+def index_products(products):
+    get_search_backend().index(products)
+    index_trigrams(products)
+
+
+def remove_products(product_ids):
+    # trigram rows go away with the product through the foreign key cascade
+    get_search_backend().remove(product_ids)
+
+
+def rebuild_index(batch_size=INDEX_BATCH_SIZE):
+    """Reindex every product, committing after each batch.
+
+    Writers (and SQLite's database lock) are only held up for one batch at a
+    time; searches see a partial index until the rebuild reaches the end.
+    Batches are idempotent, so products saved meanwhile are simply reindexed.
+    """
+    with transaction.atomic():
+        get_search_backend().clear()
+        ProductTrigram.objects.all().delete()
+    last_id = 0
+    indexed = 0
+    while True:
+        ids = list(
+            Product.objects.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return indexed
+        with transaction.atomic():
+            index_products(Product.objects.filter(id__in=ids))
+        indexed += len(ids)
+        last_id = ids[-1]
+
+
+DEFAULT_BACKENDS = {
+    "sqlite": "apiApp.search.SQLiteFTSBackend",
+    "postgresql": "apiApp.search.PostgresSearchBackend",
+}
+
+_backend = None
+
+
+def get_search_backend():
+    global _backend
+    if _backend is None:
+        path = settings.SEARCH_BACKEND or DEFAULT_BACKENDS.get(
+            connection.vendor, "apiApp.search.LikeSearchBackend"
+        )
+        _backend = import_string(path)()
+    return _backend
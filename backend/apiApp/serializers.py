@@ -1,43 +1,75 @@
 from rest_framework import serializers
-from .models import Product, ProductImage, Category , CartItem , Cart, Review, WishList , Carousel, Order, OrderItem
+from .models import Product, ProductImage, ProductRating, Category , CartItem , Cart, Review, WishList , Carousel, Order, OrderItem
 from django.contrib.auth import get_user_model
 
+def _image_url(image):
+    return image.url if hasattr(image, "url") else image
+
+
+def _display_image(product):
+    if product.image:
+        return _image_url(product.image)
+    if product.gallery_cover:
+        return _image_url(product.gallery_cover)
+    return None
+
+
 class ProductImageSerializer(serializers.ModelSerializer):
     class Meta:
         model = ProductImage
         fields = ["id", "image", "position"]
 
+def _product_rating(product):
+    # products nobody has reviewed yet have no ProductRating row
+    try:
+        return product.rating
+    except ProductRating.DoesNotExist:
+        return ProductRating(product=product)
+
+
 class ProductListSerializer(serializers.ModelSerializer):
+    # load products with select_related("rating") (or prefetch "...product__rating"),
+    # otherwise each card costs a ProductRating query
     display_image = serializers.SerializerMethodField()
+    average_rating = serializers.SerializerMethodField()
+    total_reviews = serializers.SerializerMethodField()
 
     class Meta:
         model = Product
-        fields = ['id', 'name', 'slug', 'image', 'display_image', 'price']
+        fields = ['id', 'name', 'slug', 'image', 'display_image', 'price', 'average_rating', 'total_reviews']
 
     def get_display_image(self, product):
-        if product.image:
-            return product.image.url if hasattr(product.image, "url") else product.image
-        first_gallery = product.gallery.first()
-        if first_gallery and first_gallery.image:
-            return first_gallery.image.url if hasattr(first_gallery.image, "url") else first_gallery.image
-        return None
+        return _display_image(product)
+
+    def get_average_rating(self, product):
+        return product.average_rating
+
+    def get_total_reviews(self, product):
+        return _product_rating(product).total_reviews
+
+class ProductRatingSerializer(serializers.ModelSerializer):
+    histogram = serializers.ReadOnlyField()
+
+    class Meta:
+        model = ProductRating
+        fields = ["average_rating", "total_reviews", "histogram"]
+
 
 class ProductDetailSerializer(serializers.ModelSerializer):
     gallery = ProductImageSerializer(many=True, read_only=True)
     display_image = serializers.SerializerMethodField()
     all_images = serializers.SerializerMethodField()
+    rating = serializers.SerializerMethodField()
 
     class Meta:
         model = Product
-        fields = ['id', 'name', 'slug', 'description', 'image', 'display_image', 'all_images', 'gallery', 'price']
+        fields = ['id', 'name', 'slug', 'description', 'image', 'display_image', 'all_images', 'gallery', 'price', 'rating']
 
     def get_display_image(self, product):
-        if product.image:
-            return product.image.url if hasattr(product.image, "url") else product.image
-        first_gallery = product.gallery.first()
-        if first_gallery and first_gallery.image:
-            return first_gallery.image.url if hasattr(first_gallery.image, "url") else first_gallery.image
-        return None
+        return _display_image(product)
+
+    def get_rating(self, product):
+        return ProductRatingSerializer(_product_rating(product)).data
 
     def get_all_images(self, product):
         urls = []
@@ -57,10 +89,9 @@ class CategoryListSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'image', 'slug']
 
 class CategoryDetailSerializer(serializers.ModelSerializer):
-    Product = ProductListSerializer(many=True, read_only=True)
     class Meta:
         model = Category
-        fields = ['id', 'name', 'image', 'Product']
+        fields = ['id', 'name', 'image']
 
 class CartItemSerializer(serializers.ModelSerializer):
     product = ProductListSerializer(read_only=True)
@@ -81,9 +112,7 @@ class CartSerializer(serializers.ModelSerializer):
         fields = ["id","cart_code","cartitems","cart_total"]
 
     def get_cart_total(self, cart):
-        items = cart.cartitems.all()
-        total = sum([item.quantity * item.product.price for item in items])
-        return total
+        return cart.subtotal
 
 class CartStartSerializer(serializers.ModelSerializer):
     total_quantity = serializers.SerializerMethodField()
@@ -92,9 +121,7 @@ class CartStartSerializer(serializers.ModelSerializer):
         fields = ["id","cart_code","total_quantity"]
 
     def get_total_quantity(self, cart):
-        items = cart.cartitems.all()
-        total = sum([item.quantity for item in items])
-        return total
+        return cart.total_quantity
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
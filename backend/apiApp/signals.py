@@ -1,33 +1,117 @@
-from django.db.models.signals import post_save , post_delete
+from django.db.models.signals import post_save , post_delete, pre_delete, pre_save
 from django.dispatch import receiver
-from django.db.models import Avg
+from django.db import transaction
 
-from apiApp.models import ProductRating, Review
+from apiApp.models import Carousel, Cart, CartItem, CatalogVersion, Category, Product, ProductImage, ProductRating, Review
+from apiApp.carts import recalculate_cart_totals
+from apiApp.ratings import adjust_product_rating
+from apiApp.search import index_products, remove_products
+from apiApp.suggest import suggest_index
+
+@receiver(pre_save, sender=Review)
+def collect_previous_rating_on_save(sender, instance, **kwargs):
+    # an edit moves the review's rating out of the stored sum, so remember what it was
+    instance._previous_rating = None
+    if not instance._state.adding:
+        instance._previous_rating = (
+            Review.objects.filter(pk=instance.pk).values_list("product_id", "rating").first()
+        )
 
 @receiver(post_save, sender=Review)
-def update_product_rating_on_save(sender,instance, **kwargs):
-    product = instance.product
-    reviews = product.reviews.all()
-    total_reviews = reviews.count()
+def update_product_rating_on_save(sender, instance, **kwargs):
+    previous = getattr(instance, "_previous_rating", None)
+    rating = int(instance.rating)
+    if previous is None:
+        adjust_product_rating(instance.product_id, added=rating)
+    elif previous[0] != instance.product_id:
+        adjust_product_rating(previous[0], removed=previous[1])
+        adjust_product_rating(instance.product_id, added=rating)
+    elif previous[1] != rating:
+        adjust_product_rating(instance.product_id, added=rating, removed=previous[1])
+
+@receiver(post_delete, sender=Review)
+def update_product_rating_on_delete(sender, instance, **kwargs):
+    adjust_product_rating(instance.product_id, removed=instance.rating)
 
-    review_average = reviews.aggregate(Avg("rating"))["rating__avg"] or 0.0
 
-    product_rating , created = ProductRating.objects.get_or_create(product=product)
-    product_rating.average_rating = review_average 
-    product_rating.total_reviews = total_reviews 
+def _refresh_gallery_cover(product_id):
+    cover = (
+        ProductImage.objects.filter(product_id=product_id)
+        .order_by("position", "id")
+        .values_list("image", flat=True)
+        .first()
+    )
+    Product.objects.filter(pk=product_id).update(gallery_cover=cover or None)
 
-    product_rating.save()
+@receiver(post_save, sender=ProductImage)
+def update_gallery_cover_on_save(sender, instance, **kwargs):
+    _refresh_gallery_cover(instance.product_id)
+
+@receiver(post_delete, sender=ProductImage)
+def update_gallery_cover_on_delete(sender, instance, **kwargs):
+    _refresh_gallery_cover(instance.product_id)
+
+
+@receiver(post_save, sender=Product)
+def index_product_on_save(sender, instance, **kwargs):
+    index_products(Product.objects.filter(pk=instance.pk))
+    pk, name, slug = instance.pk, instance.name, instance.slug
+    transaction.on_commit(lambda: suggest_index.update("product", pk, name, slug))
+
+@receiver(post_delete, sender=Product)
+def unindex_product_on_delete(sender, instance, **kwargs):
+    remove_products([instance.pk])
+    pk = instance.pk
+    transaction.on_commit(lambda: suggest_index.remove("product", pk))
+
+@receiver(post_save, sender=Category)
+def reindex_category_products_on_save(sender, instance, created, **kwargs):
+    if not created:
+        index_products(Product.objects.filter(category_id=instance.pk))
+    pk, name, slug = instance.pk, instance.name, instance.slug
+    transaction.on_commit(lambda: suggest_index.update("category", pk, name, slug))
+
+@receiver(pre_delete, sender=Category)
+def collect_category_products_on_delete(sender, instance, **kwargs):
+    # products are detached (SET_NULL) before post_delete fires, so remember them now
+    instance._search_product_ids = list(instance.Product.values_list("id", flat=True))
+
+@receiver(post_delete, sender=Category)
+def reindex_category_products_on_delete(sender, instance, **kwargs):
+    product_ids = getattr(instance, "_search_product_ids", [])
+    if product_ids:
+        index_products(Product.objects.filter(pk__in=product_ids))
+    pk = instance.pk
+    transaction.on_commit(lambda: suggest_index.remove("category", pk))
+
+
+# Review writes change the stored ProductRating through update(), which sends no signals
+CATALOG_MODELS = [Product, Category, ProductImage, Carousel, ProductRating, Review]
+
+def bump_catalog_version(sender, **kwargs):
+    CatalogVersion.bump()
+
+for model in CATALOG_MODELS:
+    post_save.connect(bump_catalog_version, sender=model, dispatch_uid=f"catalog_version_save_{model.__name__}")
+    post_delete.connect(bump_catalog_version, sender=model, dispatch_uid=f"catalog_version_delete_{model.__name__}")
 
-@receiver(post_delete, sender=Review)
-def update_product_rating_on_delete(sender,instance, **kwargs):
-    product = instance.product
-    reviews = product.reviews.all()
-    total_reviews = reviews.count()
 
-    review_average = reviews.aggregate(Avg("rating"))["rating__avg"] or 0.0
+@receiver(post_save, sender=Product)
+def refresh_cart_totals_on_product_save(sender, instance, created, **kwargs):
+    # a price change invalidates the stored subtotal of every cart holding the product
+    if not created:
+        recalculate_cart_totals(
+            Cart.objects.filter(id__in=CartItem.objects.filter(product=instance).values("cart_id"))
+        )
 
-    product_rating , created = ProductRating.objects.get_or_create(product=product)
-    product_rating.average_rating = review_average 
-    product_rating.total_reviews = total_reviews 
+@receiver(pre_delete, sender=Product)
+def collect_carts_on_product_delete(sender, instance, **kwargs):
+    instance._affected_cart_ids = list(
+        CartItem.objects.filter(product=instance).values_list("cart_id", flat=True)
+    )
 
-    product_rating.save()
\ No newline at end of file
+@receiver(post_delete, sender=Product)
+def refresh_cart_totals_on_product_delete(sender, instance, **kwargs):
+    cart_ids = getattr(instance, "_affected_cart_ids", [])
+    if cart_ids:
+        recalculate_cart_totals(Cart.objects.filter(id__in=cart_ids))
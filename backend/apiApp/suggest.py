@@ -0,0 +1,145 @@
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db import connection
+
+from .models import Category, Product
+
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(text):
+    return " ".join((text or "").lower().split())
+
+
+def _keys(name):
+    # every word boundary starts a key, so "pro" finds "Apple iPhone 15 Pro"
+    words = _normalize(name).split(" ")
+    return [" ".join(words[i:]) for i in range(len(words)) if words[i]]
+
+
+class PrefixIndex:
+    """Process-local sorted array of name keys, searched with bisect.
+
+    Signals keep it current for writes made by this process; a full reload
+    after SUGGEST_INDEX_TTL seconds picks up writes made by other workers.
+    That reload runs on a background thread while requests keep reading the
+    current index; only the very first load blocks, and only one thread does it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # held by whichever thread is loading; others never start a second load
+        self._load_lock = threading.Lock()
+        self._keys = []
+        self._entries = {}
+        self._loaded_at = None
+        # writes seen while a load is reading the tables, replayed onto its result
+        self._pending = None
+
+    def _add(self, kind, pk, name, slug):
+        self._remove(kind, pk)
+        keys = _keys(name)
+        self._entries[(kind, pk)] = (keys, {"type": kind, "name": name, "slug": slug})
+        for key in keys:
+            insort(self._keys, (key, kind, pk))
+
+    def _remove(self, kind, pk):
+        entry = self._entries.pop((kind, pk), None)
+        if not entry:
+            return
+        for key in entry[0]:
+            position = bisect_left(self._keys, (key, kind, pk))
+            if position < len(self._keys) and self._keys[position] == (key, kind, pk):
+                del self._keys[position]
+
+    def load(self):
+        with self._lock:
+            self._pending = []
+        keys = []
+        entries = {}
+        sources = (
+            ("category", Category.objects.values_list("id", "name", "slug")),
+            ("product", Product.objects.values_list("id", "name", "slug")),
+        )
+        for kind, rows in sources:
+            for pk, name, slug in rows.iterator():
+                entry_keys = _keys(name)
+                entries[(kind, pk)] = (entry_keys, {"type": kind, "name": name, "slug": slug})
+                keys.extend((key, kind, pk) for key in entry_keys)
+        keys.sort()
+        with self._lock:
+            self._keys = keys
+            self._entries = entries
+            for change, args in self._pending or []:
+                change(*args)
+            self._pending = None
+            self._loaded_at = time.monotonic()
+
+    def _background_load(self):
+        try:
+            self.load()
+        except Exception:
+            logger.exception("Reloading the suggest index failed")
+            with self._lock:
+                self._pending = None
+        finally:
+            connection.close()
+            self._load_lock.release()
+
+    def is_loaded(self):
+        return self._loaded_at is not None
+
+    def ensure_loaded(self):
+        if self._loaded_at is None:
+            with self._load_lock:
+                if self._loaded_at is None:
+                    try:
+                        self.load()
+                    finally:
+                        with self._lock:
+                            self._pending = None
+            return
+        ttl = settings.SUGGEST_INDEX_TTL
+        if ttl and time.monotonic() - self._loaded_at > ttl and self._load_lock.acquire(blocking=False):
+            threading.Thread(target=self._background_load, daemon=True).start()
+
+    def _change(self, change, *args):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((change, args))
+            elif self._loaded_at is None:
+                return
+            change(*args)
+
+    def update(self, kind, pk, name, slug):
+        self._change(self._add, kind, pk, name, slug)
+
+    def remove(self, kind, pk):
+        self._change(self._remove, kind, pk)
+
+    def suggest(self, prefix, limit):
+        prefix = _normalize(prefix)
+        if not prefix:
+            return []
+        self.ensure_loaded()
+        results = []
+        seen = set()
+        with self._lock:
+            position = bisect_left(self._keys, (prefix,))
+            while position < len(self._keys) and len(results) < limit:
+                key, kind, pk = self._keys[position]
+                if not key.startswith(prefix):
+                    break
+                if (kind, pk) not in seen:
+                    seen.add((kind, pk))
+                    results.append(self._entries[(kind, pk)][1])
+                position += 1
+        return results
+
+
+suggest_index = PrefixIndex()
@@ -0,0 +1,143 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import Cart, CartItem, Category, Order, Product, ProductRating, WishList
+from .pagination import encode_cursor
+
+
+PAGE = 100
+
+
+class ProductListQueryCountTests(TestCase):
+    """A page of product cards must cost the same queries for 1 product or 100.
+
+    Every list payload carries the product's rating, which is only cheap when
+    the view loads it in the same query as the products.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="Widgets", slug="widgets")
+        cls.products = [
+            Product.objects.create(
+                name=f"Widget {index}", slug=f"widget-{index}", description="", price=10 + index,
+                category=cls.category,
+            )
+            for index in range(PAGE)
+        ]
+        ProductRating.objects.bulk_create([
+            ProductRating(product=product, rating_sum=9, total_reviews=2, average_rating=4.5)
+            for product in cls.products[::2]
+        ])
+        Product.objects.filter(pk__in=[product.pk for product in cls.products[::2]]).update(average_rating=4.5)
+        cls.user = get_user_model().objects.create_user(
+            username="shopper", email="shopper@example.com", password="secret"
+        )
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+
+    def assertRated(self, cards):
+        self.assertEqual(len(cards), PAGE)
+        rated = {card["id"]: (card["average_rating"], card["total_reviews"]) for card in cards}
+        self.assertEqual(rated[self.products[0].id], (4.5, 2))
+        self.assertEqual(rated[self.products[1].id], (0.0, 0))
+
+    def test_product_list(self):
+        with self.assertNumQueries(5):
+            response = self.client.get("/product/", {"page_size": PAGE})
+        self.assertRated(response.json()["results"])
+
+    def test_category_detail(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(f"/category_detail/{self.category.slug}", {"page_size": PAGE})
+        self.assertRated(response.json()["Product"])
+
+    def test_search(self):
+        with self.assertNumQueries(2):
+            response = self.client.get("/search", {"query": "widget", "page_size": PAGE})
+        self.assertRated(response.json()["results"])
+
+    def test_cart_detail(self):
+        cart = Cart.objects.create(cart_code="query-count-cart")
+        CartItem.objects.bulk_create([CartItem(cart=cart, product=product, quantity=1) for product in self.products])
+        with self.assertNumQueries(4):
+            response = self.client.get(f"/cart/{cart.cart_code}/")
+        self.assertRated([item["product"] for item in response.json()["cartitems"]])
+
+    def test_wishlist(self):
+        WishList.objects.bulk_create([WishList(user=self.user, product=product) for product in self.products])
+        token = RefreshToken.for_user(self.user).access_token
+        with self.assertNumQueries(1):
+            response = self.client.get("/wishlist_item/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        self.assertRated([item["product"] for item in response.json()])
+
+
+class CursorValidationTests(TestCase):
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+
+    def test_cursor_values_of_the_wrong_type_are_rejected(self):
+        product = Product.objects.create(name="Widget", slug="widget", description="", price=10)
+        cases = [
+            ("/product/", "default", ["x"]),
+            ("/product/", "default", [{"a": 1}]),
+            ("/product/", "price", ["abc", 1]),
+            (f"/reviews/{product.id}/", "newest", ["not a date", 1]),
+        ]
+        for url, sort, values in cases:
+            with self.subTest(url=url, values=values):
+                response = self.client.get(url, {"sort": sort, "cursor": encode_cursor(sort, values)})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {"error": "Invalid cursor."})
+
+
+class RateLimitTests(TestCase):
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+
+    def test_catalog_traffic_does_not_reset_login_limit(self):
+        credentials = {"email": "victim@example.com", "password": "wrong"}
+        for _ in range(5):
+            self.client.post("/auth/login/", credentials, content_type="application/json")
+        self.assertEqual(self.client.post("/auth/login/", credentials, content_type="application/json").status_code, 429)
+        for price in range(400):
+            self.client.get("/product/", {"min_price": price})
+        self.assertEqual(self.client.post("/auth/login/", credentials, content_type="application/json").status_code, 429)
+
+    @override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend", OTP_FROM_EMAIL="shop@example.com")
+    def test_wrong_email_does_not_spend_the_order_otp_limit(self):
+        order = Order.objects.create(order_id="ORD-OTP", amount=10, customer_email="owner@example.com")
+        url = f"/orders/{order.order_id}/send-otp/"
+        response = self.client.post(url, {"email": "stranger@example.com"}, content_type="application/json")
+        self.assertEqual(response.status_code, 403)
+        response = self.client.post(url, {"email": "owner@example.com"}, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post(url, {"email": "owner@example.com"}, content_type="application/json")
+        self.assertEqual(response.status_code, 429)
+
+
+class CartBatchTests(TestCase):
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+
+    def test_set_without_quantity_is_rejected(self):
+        product = Product.objects.create(name="Widget", slug="widget", description="", price=10)
+        cart = Cart.objects.create(cart_code="batch-cart")
+        CartItem.objects.create(cart=cart, product=product, quantity=2)
+        response = self.client.post(
+            f"/cart/{cart.cart_code}/batch/",
+            {"operations": [{"op": "set", "product_id": product.id}]},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(CartItem.objects.get(cart=cart, product=product).quantity, 2)
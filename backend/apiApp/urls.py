@@ -2,15 +2,19 @@ from django.conf import settings
 from django.urls import path
 from . import views
 from django.conf.urls.static import static
+from rest_framework_simplejwt.views import TokenRefreshView
 
 urlpatterns = [
     path("auth/google/config/", views.google_oauth_config, name="google_oauth_config"),
     path("auth/register/", views.register_user, name="register_user"),
     path("auth/login/", views.login_user, name="login_user"),
     path("auth/google/", views.google_login, name="google_login"),
+    path("auth/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     
     path("reviews/<int:product_id>/", views.product_reviews, name="product_reviews"),
+    path("reviews/<int:product_id>/histogram/", views.product_rating_histogram, name="product_rating_histogram"),
     path("cart/<str:cart_code>/", views.cart_detail, name="cart_detail"),
+    path("cart/<str:cart_code>/batch/", views.cart_batch, name="cart_batch"),
     path("product/", views.product_list,name='product_list'),
     path("product_details/<slug:slug>", views.product_details,name='product_details'),
 
@@ -29,9 +33,11 @@ urlpatterns = [
 
 
     path("wishlist_item/",views.wishlist_item, name="wishlist_item"),
+    path("wishlist_item/status/",views.wishlist_status, name="wishlist_status"),
     path("add_to_wishlist/",views.add_to_wishlist, name="add_to_wishlist"),
     
     path("search",views.product_search, name="search"),
+    path("search/suggest",views.search_suggest, name="search_suggest"),
 
     path("checkout/",views.create_checkout_session, name="checkout"),
     path("place_order/", views.place_order, name="place_order"),
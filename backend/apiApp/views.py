@@ -1,12 +1,26 @@
 from django.shortcuts import render
 
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-
-from .models import Carousel, Order, OrderItem, Product , Category , Cart , CartItem, Review, WishList
-
-from .serializers import CarouselSerializer, CartItemSerializer, CartSerializer, OrderSerializer, ProductListSerializer , ProductDetailSerializer , CategoryDetailSerializer , CategoryListSerializer, ReviewSerializer, WishListSerializer, UserSerializer, UserUpdateSerializer
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import Carousel, Order, OrderItem, Product , ProductRating, Category , Cart , Review, WishList
+
+from .serializers import CarouselSerializer, OrderSerializer, ProductListSerializer , ProductDetailSerializer , ProductRatingSerializer , CategoryDetailSerializer , CategoryListSerializer, ReviewSerializer, WishListSerializer, UserSerializer, UserUpdateSerializer
+from .pagination import REVIEW_SORTS, CursorError, decode_cursor, encode_cursor, get_page_size, paginate_queryset
+from .search import get_search_backend, trigram_search
+from .suggest import suggest_index
+from .cart_storage import CartBusy, CartNotFound, get_cart_storage
+from .outbox import queue_email
+from .payment_events import HANDLED_EVENT_TYPES, record_event
+from .payments import WebhookSignatureError, get_payment_gateway
+from .google_auth import verify_google_id_token
+from .ratelimit import rate_limit, throttle
+from .caching import cache_catalog_response, catalog_conditional
+from .filters import FilterError, apply_product_filters, catalog_queryset, parse_product_filters, product_facets
 
 from django.conf import settings
 
@@ -14,15 +28,13 @@ from django.contrib.auth import get_user_model, authenticate
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
 from django.template.loader import render_to_string
-from django.core.mail import EmailMessage
 
-from django.db.models import Q
+from django.db.models import prefetch_related_objects
 from decimal import Decimal, ROUND_HALF_UP
 from datetime import timedelta
+import json
 import random
 
-import stripe  # type: ignore   to suppers the warning
-import requests
 
 from django.http import HttpResponse
 from django.views.decorators.csrf import csrf_exempt
@@ -34,10 +46,9 @@ import logging
 
 
 User = get_user_model()
-endpoint_secret = settings.WEB_HOOK_SECRET_KEY
-stripe.api_key = settings.STRIPE_SECRET_KEY
 DEFAULT_DELIVERY_CHARGE = Decimal("280.00")
 DEFAULT_CURRENCY = "inr"
+MAX_CART_BATCH_OPERATIONS = 100
 logger = logging.getLogger(__name__)
 
 
@@ -45,6 +56,13 @@ def _serialize_user(user):
     return UserSerializer(user).data
 
 
+def _issue_tokens(user):
+    refresh = RefreshToken.for_user(user)
+    # copied into every access token minted from this refresh token
+    refresh["email"] = user.email
+    return {"access": str(refresh.access_token), "refresh": str(refresh)}
+
+
 def _to_decimal(value, fallback=Decimal("0.00")):
     try:
         return Decimal(str(value))
@@ -60,7 +78,7 @@ def _generate_otp():
     return f"{random.randint(0, 999999):06d}"
 
 
-def _send_order_confirmation_email(order):
+def _queue_order_confirmation_email(order):
     from_email = settings.DEFAULT_FROM_EMAIL or settings.EMAIL_HOST_USER
     if not from_email:
         raise ValueError("Sender email is not configured on server.")
@@ -72,14 +90,12 @@ def _send_order_confirmation_email(order):
         "payment_method": order.payment_method,
     })
 
-    email = EmailMessage(
+    queue_email(
         subject=f"Your Madstore Order is Confirmed - {order.order_id}",
         body=html,
+        to=order.customer_email,
         from_email=from_email,
-        to=[order.customer_email],
     )
-    email.content_subtype = "html"
-    email.send(fail_silently=False)
 
 
 def _build_order_data(request):
@@ -97,12 +113,18 @@ def _build_order_data(request):
     }
 
 
-def _create_order_from_cart(cart, order_data, strip_checkout_id=None, status_value=None):
+def _create_order_from_cart(cart, order_data, strip_checkout_id=None, status_value=None, currency=DEFAULT_CURRENCY, amount=None):
+    # Call inside transaction.atomic() together with discarding the cart. The row lock
+    # serializes place_order, the webhook and finalize_checkout for the same cart; the
+    # loser finds the cart already gone (or emptied) and gets None instead of a duplicate order.
+    if not Cart.objects.select_for_update().filter(pk=cart.pk).exists():
+        return None
+    items = list(cart.cartitems.select_related("product"))
+    if not items:
+        return None
+
     subtotal = _quantize_money(
-        sum(
-            _to_decimal(item.product.price) * item.quantity
-            for item in cart.cartitems.select_related("product").all()
-        )
+        sum(_to_decimal(item.product.price) * item.quantity for item in items)
     )
     delivery_charge = DEFAULT_DELIVERY_CHARGE if subtotal > 0 else Decimal("0.00")
     total_amount = _quantize_money(subtotal + delivery_charge)
@@ -114,8 +136,8 @@ def _create_order_from_cart(cart, order_data, strip_checkout_id=None, status_val
         strip_checkout_id=strip_checkout_id,
         subtotal=subtotal,
         delivery_charge=delivery_charge,
-        amount=total_amount,
-        currency=DEFAULT_CURRENCY,
+        amount=total_amount if amount is None else amount,
+        currency=currency,
         customer_email=order_data.get("email", ""),
         buyer_name=order_data.get("buyer_name", ""),
         phone=order_data.get("phone", ""),
@@ -130,13 +152,17 @@ def _create_order_from_cart(cart, order_data, strip_checkout_id=None, status_val
         is_received=False,
     )
 
-    for item in cart.cartitems.select_related("product").all():
-        OrderItem.objects.create(
+    OrderItem.objects.bulk_create([
+        OrderItem(
             order=order,
             product=item.product,
             quantity=item.quantity,
             unit_price=_quantize_money(_to_decimal(item.product.price)),
         )
+        for item in items
+    ])
+    # the response serializer and the confirmation email both walk order.items
+    prefetch_related_objects([order], "items__product__rating")
     return order
 
 
@@ -156,31 +182,7 @@ def _verify_google_id_token(id_token):
     if not settings.GOOGLE_OAUTH_CLIENT_ID:
         raise ValueError("Google OAuth is not configured on the server.")
 
-    try:
-        response = requests.get(
-            "https://oauth2.googleapis.com/tokeninfo",
-            params={"id_token": id_token},
-            timeout=8,
-        )
-    except requests.RequestException as exc:
-        raise ValueError("Could not reach Google token verification endpoint.") from exc
-
-    if response.status_code != 200:
-        raise ValueError("Invalid Google token.")
-
-    payload = response.json()
-    issuer = payload.get("iss")
-    audience = payload.get("aud")
-    email_verified = payload.get("email_verified")
-
-    if issuer not in ["accounts.google.com", "https://accounts.google.com"]:
-        raise ValueError("Invalid Google token issuer.")
-    if audience != settings.GOOGLE_OAUTH_CLIENT_ID:
-        raise ValueError("Google token audience mismatch.")
-    if str(email_verified).lower() != "true":
-        raise ValueError("Google email is not verified.")
-
-    return payload
+    return verify_google_id_token(id_token, settings.GOOGLE_OAUTH_CLIENT_ID)
 
 
 @api_view(['POST'])
@@ -210,10 +212,15 @@ def register_user(request):
         last_name=last_name,
     )
 
-    return Response({"user": _serialize_user(user), "message": "Account created."}, status=status.HTTP_201_CREATED)
+    return Response({"user": _serialize_user(user), **_issue_tokens(user), "message": "Account created."}, status=status.HTTP_201_CREATED)
+
+
+def _login_identity(request):
+    return (request.data.get("email") or "").strip().lower()
 
 
 @api_view(['POST'])
+@rate_limit("login", identity=_login_identity)
 def login_user(request):
     data = request.data or {}
     email = (data.get("email") or "").strip().lower()
@@ -226,7 +233,7 @@ def login_user(request):
     if not user:
         return Response({"error": "Invalid credentials."}, status=status.HTTP_401_UNAUTHORIZED)
 
-    return Response({"user": _serialize_user(user), "message": "Login successful."})
+    return Response({"user": _serialize_user(user), **_issue_tokens(user), "message": "Login successful."})
 
 
 @api_view(['POST'])
@@ -274,32 +281,71 @@ def google_login(request):
         if updated:
             user.save()
 
-    return Response({"user": _serialize_user(user), "message": "Google login successful."})
+    return Response({"user": _serialize_user(user), **_issue_tokens(user), "message": "Google login successful."})
 
+@catalog_conditional
+@cache_catalog_response
 @api_view(['GET'])
 def product_list(request):
-    product = Product.objects.all()
-    serializer = ProductListSerializer(product , many=True)
-    return Response(serializer.data)
-
+    sort = request.query_params.get("sort") or "default"
+    try:
+        filters = parse_product_filters(request.query_params)
+        queryset = apply_product_filters(catalog_queryset(), filters)
+        products, next_cursor = paginate_queryset(queryset, request, sort)
+    except (CursorError, FilterError) as exc:
+        return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    serializer = ProductListSerializer(products , many=True)
+    data = {"results": serializer.data, "next": next_cursor}
+    # facets describe the whole result set, so only the first page carries them
+    if not request.query_params.get("cursor"):
+        data["facets"] = product_facets(filters)
+    return Response(data)
+
+@catalog_conditional
+@cache_catalog_response
 @api_view(['GET'])
 def product_details(request,slug):
-    product = Product.objects.filter(slug=slug)
+    product = Product.objects.filter(slug=slug).select_related("rating")
     serializer = ProductDetailSerializer(product , many=True)
     return Response(serializer.data)
 
+@catalog_conditional
+@cache_catalog_response
+@api_view(['GET'])
+def product_rating_histogram(request, product_id):
+    rating = ProductRating.objects.filter(product_id=product_id).first()
+    if rating is None:
+        if not Product.objects.filter(id=product_id).exists():
+            return Response({"error": "Product not found."}, status=status.HTTP_404_NOT_FOUND)
+        rating = ProductRating(product_id=product_id)
+    return Response(ProductRatingSerializer(rating).data)
+
+@catalog_conditional
+@cache_catalog_response
 @api_view(['GET'])
 def category_list(request):
     categories = Category.objects.all()
     serializer = CategoryListSerializer(categories , many=True)
     return Response(serializer.data)
 
+@catalog_conditional
+@cache_catalog_response
 @api_view(['GET'])
 def category_detail(request, slug):
     category = Category.objects.get(slug=slug)
-    serializer = CategoryDetailSerializer(category)
-    return Response(serializer.data)
+    sort = request.query_params.get("sort") or "default"
+    try:
+        queryset = catalog_queryset().filter(category=category)
+        products, next_cursor = paginate_queryset(queryset, request, sort)
+    except CursorError as exc:
+        return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    data = CategoryDetailSerializer(category).data
+    data["Product"] = ProductListSerializer(products, many=True).data
+    data["next"] = next_cursor
+    return Response(data)
 
+@catalog_conditional
+@cache_catalog_response
 @api_view(['GET'])
 def carousel_images(request):
     product = Carousel.objects.filter(is_active=True)
@@ -307,6 +353,14 @@ def carousel_images(request):
     return Response(serializer.data)
 
 
+def _cart_busy_response():
+    return Response(
+        {"error": "The cart is being updated by another request. Please retry."},
+        status=status.HTTP_409_CONFLICT,
+        headers={"Retry-After": "1"},
+    )
+
+
 @api_view(['POST'])
 def add_to_cart(request):
     cart_code = (request.data.get("cart_code") or "").strip()
@@ -321,16 +375,69 @@ def add_to_cart(request):
     except Product.DoesNotExist:
         return Response({"error": "Product not found."}, status=status.HTTP_404_NOT_FOUND)
 
-    cart, _ = Cart.objects.get_or_create(cart_code=cart_code)
-    cartitem, created = CartItem.objects.get_or_create(product=product, cart=cart)
-    if created:
-        cartitem.quantity = 1
-    else:
-        cartitem.quantity += 1
-    cartitem.save()
+    storage = get_cart_storage()
+    try:
+        storage.add(cart_code, product)
+    except CartBusy:
+        return _cart_busy_response()
+
+    # mode=delta returns just the touched line and the new totals
+    if request.data.get("mode") == "delta":
+        return Response(storage.line(cart_code, product.id))
+
+    return Response(storage.detail(cart_code))
+
+
+def _parse_cart_operations(raw_operations):
+    if not isinstance(raw_operations, list) or not raw_operations:
+        raise ValueError("operations must be a non-empty list.")
+    if len(raw_operations) > MAX_CART_BATCH_OPERATIONS:
+        raise ValueError(f"At most {MAX_CART_BATCH_OPERATIONS} operations are allowed per batch.")
+
+    operations = []
+    for raw in raw_operations:
+        if not isinstance(raw, dict):
+            raise ValueError("Each operation must be an object.")
+        op = raw.get("op")
+        if op not in ["add", "set", "remove"]:
+            raise ValueError("op must be one of add, set or remove.")
+        if op == "set" and raw.get("quantity") is None:
+            raise ValueError("set requires a quantity; use remove to delete a line.")
+        try:
+            product_id = int(raw.get("product_id"))
+            quantity = int(raw.get("quantity", 1 if op == "add" else 0))
+        except (TypeError, ValueError):
+            raise ValueError("product_id and quantity must be numbers.")
+        if op == "add" and quantity < 1:
+            raise ValueError("add quantity must be at least 1.")
+        if quantity < 0:
+            raise ValueError("quantity cannot be negative.")
+        operations.append((op, product_id, quantity))
+    return operations
 
-    serializer = CartSerializer(cart)
-    return Response(serializer.data)
+
+@api_view(['POST'])
+def cart_batch(request, cart_code):
+    try:
+        operations = _parse_cart_operations(request.data.get("operations"))
+    except ValueError as exc:
+        return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    product_ids = {product_id for _, product_id, _ in operations}
+    products = Product.objects.in_bulk(product_ids)
+    missing = sorted(product_ids - set(products))
+    if missing:
+        return Response(
+            {"error": "Product not found.", "product_ids": missing},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    storage = get_cart_storage()
+    try:
+        storage.apply_operations(cart_code, operations, products)
+    except CartBusy:
+        return _cart_busy_response()
+    return Response(storage.detail(cart_code))
 
 
 @api_view(['PUT'])
@@ -346,31 +453,31 @@ def update_cartitem_quantity(request):
     if quantity < 1:
         return Response({"error": "quantity must be at least 1."}, status=status.HTTP_400_BAD_REQUEST)
     try:
-        cartitem = CartItem.objects.get(id=cartitem_id)
-    except CartItem.DoesNotExist:
+        item = get_cart_storage().update_item(cartitem_id, quantity, request.data.get("cart_code"))
+    except CartNotFound:
         return Response({"error": "Cart item not found."}, status=status.HTTP_404_NOT_FOUND)
+    except CartBusy:
+        return _cart_busy_response()
 
-    cartitem.quantity = quantity
-    cartitem.save()
-
-    serializer = CartItemSerializer(cartitem)
-    return Response({"data": serializer.data, "message": "Cart updated successfully."})
+    return Response({"data": item, "message": "Cart updated successfully."})
 
 @api_view(["DELETE"])
 def delete_cart_item(request,pk):
     try:
-        cartitem = CartItem.objects.get(id=pk)
-    except CartItem.DoesNotExist:
+        get_cart_storage().delete_item(pk, request.query_params.get("cart_code"))
+    except CartNotFound:
         return Response({"error": "Cart item not found."}, status=status.HTTP_404_NOT_FOUND)
-    cartitem.delete()
+    except CartBusy:
+        return _cart_busy_response()
 
     return Response({"message": "Cart item deleted successfully."}, status=204)
 
 
 @api_view(["POST"])
+@authentication_classes([JWTStatelessUserAuthentication])
+@permission_classes([IsAuthenticated])
 def add_review(request):
     product_id = request.data.get("product_id")
-    email = request.data.get("email")
     rating = request.data.get("rating")
     review_text = request.data.get("review")
 
@@ -378,15 +485,12 @@ def add_review(request):
         product = Product.objects.get(id=product_id)
     except Product.DoesNotExist:
         return Response({"error": "Product not found."}, status=404)
-    try:
-        user = User.objects.get(email=email)
-    except User.DoesNotExist:
-        return Response({"error": "User not found. Please sign in."}, status=400)
 
-    if Review.objects.filter(product=product, user=user).exists():
+    if Review.objects.filter(product=product, user_id=request.user.id).exists():
         return Response("You have already dropped a review", status=400)
     
-    review = Review.objects.create(product=product, user=user, rating=rating,review=review_text)
+    with transaction.atomic():
+        review = Review.objects.create(product=product, user_id=request.user.id, rating=rating,review=review_text)
     serializer = ReviewSerializer(review)
     return Response(serializer.data)
 
@@ -398,7 +502,8 @@ def update_review(request,pk):
 
     review.rating = int(rating)
     review.review = review_text
-    review.save()
+    with transaction.atomic():
+        review.save()
 
     serializer = ReviewSerializer(review)
     return Response(serializer.data)
@@ -406,62 +511,132 @@ def update_review(request,pk):
 @api_view(["DELETE"])
 def delete_review(request,pk):
     review = Review.objects.get(id=pk)
-    review.delete()
+    with transaction.atomic():
+        review.delete()
 
     return Response("Review Deleted Successfully")
 
 @api_view(['GET'])
+@authentication_classes([JWTStatelessUserAuthentication])
+@permission_classes([IsAuthenticated])
 def wishlist_item(request):
-    email = request.query_params.get("email") or request.data.get("email")
-    user = User.objects.get(email=email)
-
-    product = WishList.objects.filter(user=user)
+    # user, product and rating come back in one joined query; the card image is
+    # the denormalized product.gallery_cover, so the gallery is never touched
+    product = WishList.objects.filter(user_id=request.user.id).select_related("user", "product__rating")
 
     serializer = WishListSerializer(product , many=True)
     return Response(serializer.data)
 
+@api_view(['GET'])
+@authentication_classes([JWTStatelessUserAuthentication])
+@permission_classes([IsAuthenticated])
+def wishlist_status(request):
+    # ?product_ids=1,2,3 -> which of them are wishlisted, for hearting a grid of cards
+    raw_ids = [value for value in (request.query_params.get("product_ids") or "").split(",") if value.strip()]
+    try:
+        product_ids = {int(value) for value in raw_ids}
+    except ValueError:
+        return Response({"error": "product_ids must be a comma-separated list of ids."}, status=status.HTTP_400_BAD_REQUEST)
+    if len(product_ids) > settings.CATALOG_MAX_PAGE_SIZE:
+        return Response(
+            {"error": f"At most {settings.CATALOG_MAX_PAGE_SIZE} product_ids per request."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    wishlisted = []
+    if product_ids:
+        # served by the unique (user, product) index
+        wishlisted = sorted(
+            WishList.objects.filter(user_id=request.user.id, product_id__in=product_ids)
+            .values_list("product_id", flat=True)
+        )
+    return Response({"product_ids": wishlisted})
+
 @api_view(["POST"])
+@authentication_classes([JWTStatelessUserAuthentication])
+@permission_classes([IsAuthenticated])
 def add_to_wishlist(request):
-    email = request.data.get("email")
     product_id = request.data.get("product_id")
 
-    user = User.objects.get(email=email)
     product = Product.objects.get(id=product_id)
 
-    wishlist = WishList.objects.filter(user=user, product=product)
+    wishlist = WishList.objects.filter(user_id=request.user.id, product=product)
     if wishlist:
         wishlist.delete()
         return Response(f"Revomed {product.name} from the Wishlist", status=204)
     
-    new_wishlist = WishList.objects.create(user=user ,product=product)
+    new_wishlist = WishList.objects.create(user_id=request.user.id ,product=product)
     serializer = WishListSerializer(new_wishlist)
     return Response(serializer.data)
 
 @api_view(['GET'])
+@rate_limit("search")
 def product_search(request):
     query = request.query_params.get("query") 
     if not query:
         return Response("No query provided", status=400)
     
-    products = Product.objects.filter(Q(name__icontains=query) | 
-                                      Q(description__icontains=query) |
-                                       Q(category__name__icontains=query) )
-    serializer = ProductListSerializer(products, many=True)
-    return Response(serializer.data)
+    # mode=fuzzy ranks by trigram similarity; the default full-text mode falls
+    # back to it when a first page comes back empty (usually a typo)
+    mode = request.query_params.get("mode") or "text"
+    if mode not in ["text", "fuzzy"]:
+        return Response({"error": "mode must be 'text' or 'fuzzy'."}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        page_size = get_page_size(request)
+        offset = 0
+        cursor = request.query_params.get("cursor")
+        if cursor:
+            values = decode_cursor(cursor, "search")
+            if len(values) != 2 or not isinstance(values[0], int) or values[0] < 0 or values[1] not in ["text", "fuzzy"]:
+                raise CursorError("Invalid cursor.")
+            offset, mode = values
+    except CursorError as exc:
+        return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    ids = []
+    if mode == "text":
+        ids = get_search_backend().search(query, limit=page_size + 1, offset=offset)
+    if mode == "fuzzy" or (not ids and not offset):
+        mode = "fuzzy"
+        ids = trigram_search(query, limit=page_size + 1, offset=offset)
+    next_cursor = encode_cursor("search", [offset + page_size, mode]) if len(ids) > page_size else None
+    products = Product.objects.select_related("rating").in_bulk(ids[:page_size])
+    ranked = [products[pk] for pk in ids[:page_size] if pk in products]
+    serializer = ProductListSerializer(ranked, many=True)
+    return Response({"results": serializer.data, "next": next_cursor, "mode": mode})
+
+
+@api_view(['GET'])
+def search_suggest(request):
+    query = request.query_params.get("q") or request.query_params.get("query") or ""
+    try:
+        limit = int(request.query_params.get("limit", 8))
+    except (TypeError, ValueError):
+        return Response({"error": "limit must be a number."}, status=status.HTTP_400_BAD_REQUEST)
+    limit = max(1, min(limit, settings.SUGGEST_MAX_RESULTS))
+    return Response({"results": suggest_index.suggest(query, limit)})
 
 
 @api_view(['GET'])
 def product_reviews(request, product_id):
-    reviews = Review.objects.filter(product_id=product_id)
+    sort = request.query_params.get("sort") or "newest"
+    try:
+        reviews, next_cursor = paginate_queryset(
+            Review.objects.filter(product_id=product_id).select_related("user"),
+            request,
+            sort,
+            sorts=REVIEW_SORTS,
+        )
+    except CursorError as exc:
+        return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
     serializer = ReviewSerializer(reviews, many=True)
-    return Response(serializer.data)
+    return Response({"results": serializer.data, "next": next_cursor})
 
 
 @api_view(['GET'])
 def cart_detail(request, cart_code):
-    cart, _ = Cart.objects.get_or_create(cart_code=cart_code)
-    serializer = CartSerializer(cart)
-    return Response(serializer.data)
+    # read-only: unknown codes get an empty cart; the cart is created on the first write
+    return Response(get_cart_storage().detail(cart_code))
 
 
 
@@ -477,13 +652,15 @@ def create_checkout_session(request):
     if payment_method == "COD":
         return place_order(request)
 
-    cart = Cart.objects.get(cart_code=cart_code)
+    cart = get_cart_storage().materialize(cart_code)
+    if cart is None:
+        return Response({"error": "Cart not found."}, status=status.HTTP_404_NOT_FOUND)
     subtotal = _quantize_money(
         sum(_to_decimal(item.product.price) * item.quantity for item in cart.cartitems.all())
     )
     delivery_charge = DEFAULT_DELIVERY_CHARGE if subtotal > 0 else Decimal("0.00")
     try:
-        checkout_session = stripe.checkout.Session.create(
+        checkout_session = get_payment_gateway().create_checkout_session(
             customer_email= email,
             payment_method_types=['card'],
 
@@ -549,22 +726,27 @@ def place_order(request):
     if order_data["payment_method"] not in ["CARD", "COD"]:
         return Response({"error": "Invalid payment method."}, status=status.HTTP_400_BAD_REQUEST)
 
-    try:
-        cart = Cart.objects.get(cart_code=cart_code)
-    except Cart.DoesNotExist:
+    storage = get_cart_storage()
+    cart = storage.materialize(cart_code)
+    if cart is None:
         return Response({"error": "Cart not found."}, status=status.HTTP_404_NOT_FOUND)
 
     if not cart.cartitems.exists():
         return Response({"error": "Cart is empty."}, status=status.HTTP_400_BAD_REQUEST)
     
-    order = _create_order_from_cart(cart, order_data)
-    cart.delete()
-    serializer = OrderSerializer(order)    mail_warning = None
-    try:
-        _send_order_confirmation_email(order)
-    except Exception:
-        logger.exception("Failed to send order confirmation email for order %s", order.order_id)
-        mail_warning = "Order placed, but confirmation email could not be sent."
+    mail_warning = None
+    with transaction.atomic():
+        order = _create_order_from_cart(cart, order_data)
+        if order is not None:
+            storage.discard(cart_code)
+            try:
+                _queue_order_confirmation_email(order)
+            except ValueError:
+                logger.exception("Failed to queue order confirmation email for order %s", order.order_id)
+                mail_warning = "Order placed, but confirmation email could not be sent."
+    if order is None:
+        return Response({"error": "Cart not found."}, status=status.HTTP_404_NOT_FOUND)
+    serializer = OrderSerializer(order)
 
     return Response(
         {
@@ -579,7 +761,7 @@ def place_order(request):
 @api_view(['GET'])
 def track_order(request, order_id):
     try:
-        order = Order.objects.get(order_id=order_id)
+        order = Order.objects.prefetch_related("items__product__rating").get(order_id=order_id)
     except Order.DoesNotExist:
         return Response({"error": "Order not found."}, status=status.HTTP_404_NOT_FOUND)
     serializer = OrderSerializer(order)
@@ -587,13 +769,15 @@ def track_order(request, order_id):
 
 
 @api_view(['GET'])
+@authentication_classes([JWTStatelessUserAuthentication])
+@permission_classes([IsAuthenticated])
 def my_orders(request):
-    email = (request.query_params.get("email") or "").strip().lower()
+    email = (request.auth.get("email") or "").strip().lower()
     if not email:
         return Response({"error": "Email is required."}, status=status.HTTP_400_BAD_REQUEST)
     orders = (
         Order.objects.filter(customer_email=email)
-        .prefetch_related("items__product")
+        .prefetch_related("items__product__rating")
         .order_by("-created_at")
     )
     serializer = OrderSerializer(orders, many=True)
@@ -603,7 +787,7 @@ def my_orders(request):
 @api_view(['POST'])
 def mark_order_received(request, order_id):
     try:
-        order = Order.objects.get(order_id=order_id)
+        order = Order.objects.prefetch_related("items__product__rating").get(order_id=order_id)
     except Order.DoesNotExist:
         return Response({"error": "Order not found."}, status=status.HTTP_404_NOT_FOUND)
 
@@ -615,6 +799,7 @@ def mark_order_received(request, order_id):
 
 
 @api_view(['POST'])
+@rate_limit("otp")
 def send_order_otp(request, order_id):
     try:
         order = Order.objects.get(order_id=order_id)
@@ -630,12 +815,13 @@ def send_order_otp(request, order_id):
             status=status.HTTP_403_FORBIDDEN,
         )
 
+    # charged only once the caller has proven they know the order's email, so
+    # strangers guessing order ids cannot lock the owner out
+    throttled = throttle("otp", "identity", order.order_id)
+    if throttled:
+        return throttled
+
     now = timezone.now()
-    if order.otp_sent_at and (now - order.otp_sent_at).total_seconds() < 60:
-        return Response(
-            {"error": "Please wait before requesting OTP again."},
-            status=status.HTTP_429_TOO_MANY_REQUESTS,
-        )
 
     otp = _generate_otp()
     expiry = now + timedelta(minutes=10)
@@ -667,32 +853,23 @@ def send_order_otp(request, order_id):
             "Thanks,\nMadstore"
         )
 
-    try:
-        html_message = render_to_string("emails/otp_mail.html", {
-            "otp": otp,
-            "order_id": order.order_id,
-            "name": order.buyer_name or "Customer",
-        })
-        email = EmailMessage(
+    html_message = render_to_string("emails/otp_mail.html", {
+        "otp": otp,
+        "order_id": order.order_id,
+        "name": order.buyer_name or "Customer",
+    })
+
+    with transaction.atomic():
+        queue_email(
             subject=subject,
             body=html_message,
+            to=order.customer_email,
             from_email=from_email,
-            to=[order.customer_email],
         )
-
-        email.content_subtype = "html"
-        email.send()
-
-    except Exception as exc:
-        return Response(
-            {"error": f"Failed to send OTP email: {str(exc)}"},
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        )
-
-    order.otp_code = otp
-    order.otp_sent_at = now
-    order.otp_expires_at = expiry
-    order.save(update_fields=["otp_code", "otp_sent_at", "otp_expires_at"])
+        order.otp_code = otp
+        order.otp_sent_at = now
+        order.otp_expires_at = expiry
+        order.save(update_fields=["otp_code", "otp_sent_at", "otp_expires_at"])
 
     return Response(
         {
@@ -706,7 +883,7 @@ def send_order_otp(request, order_id):
 @api_view(['POST'])
 def verify_order_delivery_otp(request, order_id):
     try:
-        order = Order.objects.get(order_id=order_id)
+        order = Order.objects.prefetch_related("items__product__rating").get(order_id=order_id)
     except Order.DoesNotExist:
         return Response({"error": "Order not found."}, status=status.HTTP_404_NOT_FOUND)
 
@@ -762,32 +939,29 @@ def verify_order_delivery_otp(request, order_id):
 @csrf_exempt
 def my_webhook_view(request):
   payload = request.body
-  sig_header = request.META['HTTP_STRIPE_SIGNATURE']
+  sig_header = request.META.get('HTTP_STRIPE_SIGNATURE', '')
   event = None
 
   try:
-    event = stripe.Webhook.construct_event(
-      payload, sig_header, endpoint_secret
-    )
+    event = get_payment_gateway().construct_event(payload, sig_header)
   except ValueError as e:
     return HttpResponse(status=400)
   
-  except stripe.error.SignatureVerificationError as e:
+  except WebhookSignatureError as e:
     return HttpResponse(status=400)
 
-  if (
-    event['type'] == 'checkout.session.completed'
-    or event['type'] == 'checkout.session.async_payment_succeeded'
-  ):
-    session = event['data']['object']
-
-    metadata = session.get("metadata", {})
-    cart_code = metadata.get("cart_code")
+  # only store the event here; `manage.py process_payment_events` fulfills it, so Stripe
+  # gets its 200 after a single insert and redeliveries are dropped by the unique event id
+  if event['type'] in HANDLED_EVENT_TYPES:
+    record_event(json.loads(payload))
 
-    fulfill_checkout(session, cart_code, metadata)
+  return HttpResponse(status=200)
 
 
-  return HttpResponse(status=200)
+def handle_checkout_event(event):
+    session = event["data"]["object"]
+    metadata = session.get("metadata") or {}
+    fulfill_checkout(session, metadata.get("cart_code"), metadata)
 
 
 
@@ -810,21 +984,23 @@ def fulfill_checkout(session, cart_code, metadata=None):
         "payment_method": metadata.get("payment_method", "CARD"),
     }
 
-    order = _create_order_from_cart(
-        cart=cart,
-        order_data=order_data,
-        strip_checkout_id=session.get("id"),
-        status_value="Paid",
-    )
-    order.currency = session.get("currency", DEFAULT_CURRENCY)
-    amount_total = _to_decimal(session.get("amount_total", 0)) / Decimal("100")
-    order.amount = _quantize_money(amount_total)
-    order.save(update_fields=["currency", "amount"])
-    try:
-        _send_order_confirmation_email(order)
-    except Exception:
-        logger.exception("Failed to send order confirmation email for order %s", order.order_id)
-    cart.delete()
+    amount_total = _to_decimal(session.get("amount_total", 0)) / Decimal("100")
+    with transaction.atomic():
+        order = _create_order_from_cart(
+            cart=cart,
+            order_data=order_data,
+            strip_checkout_id=session.get("id"),
+            status_value="Paid",
+            currency=session.get("currency", DEFAULT_CURRENCY),
+            amount=_quantize_money(amount_total),
+        )
+        if order is None:
+            return
+        get_cart_storage().discard(cart_code)
+        try:
+            _queue_order_confirmation_email(order)
+        except ValueError:
+            logger.exception("Failed to queue order confirmation email for order %s", order.order_id)
 
 
 @api_view(['POST'])
@@ -833,11 +1009,15 @@ def finalize_checkout(request):
     if not session_id:
         return Response({"error": "session_id is required."}, status=status.HTTP_400_BAD_REQUEST)
     try:
-        session = stripe.checkout.Session.retrieve(session_id)
+        session = get_payment_gateway().retrieve_checkout_session(session_id)
     except Exception as exc:
         return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
-    existing = Order.objects.filter(strip_checkout_id=session_id).first()
+    existing = (
+        Order.objects.filter(strip_checkout_id=session_id)
+        .prefetch_related("items__product__rating")
+        .first()
+    )
     if existing:
         serializer = OrderSerializer(existing)
         return Response({"order": serializer.data, "message": "Order already finalized."})
@@ -850,7 +1030,11 @@ def finalize_checkout(request):
     with transaction.atomic():
         fulfill_checkout(session, cart_code, metadata)
 
-    created = Order.objects.filter(strip_checkout_id=session_id).first()
+    created = (
+        Order.objects.filter(strip_checkout_id=session_id)
+        .prefetch_related("items__product__rating")
+        .first()
+    )
     serializer = OrderSerializer(created) if created else None
     return Response({"order": serializer.data if serializer else None, "message": "Order finalized."})
 
@@ -7,16 +7,63 @@ export const normalizeUrl = (path) => {
   return `${BASE_URL}${path}`
 }
 
-const request = async (path, options = {}) => {
-  const url = normalizeUrl(path)
-  const response = await fetch(url, {
+const TOKENS_KEY = 'madstore_tokens'
+
+const readTokens = () => {
+  try {
+    return JSON.parse(window.localStorage.getItem(TOKENS_KEY)) || null
+  } catch {
+    return null
+  }
+}
+
+export const setTokens = ({ access, refresh }) => {
+  window.localStorage.setItem(TOKENS_KEY, JSON.stringify({ access, refresh }))
+}
+
+export const clearTokens = () => {
+  window.localStorage.removeItem(TOKENS_KEY)
+}
+
+const refreshAccessToken = async () => {
+  const tokens = readTokens()
+  if (!tokens?.refresh) return null
+  const response = await fetch(normalizeUrl('auth/token/refresh/'), {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ refresh: tokens.refresh }),
+  })
+  if (!response.ok) {
+    clearTokens()
+    return null
+  }
+  const data = await response.json()
+  setTokens({ access: data.access, refresh: data.refresh || tokens.refresh })
+  return data.access
+}
+
+const send = (url, options, access) =>
+  fetch(url, {
+    ...options,
     headers: {
       'Content-Type': 'application/json',
+      ...(access ? { Authorization: `Bearer ${access}` } : {}),
       ...(options.headers || {}),
     },
-    ...options,
   })
 
+const request = async (path, options = {}) => {
+  const url = normalizeUrl(path)
+  const access = readTokens()?.access
+  let response = await send(url, options, access)
+  if (response.status === 401 && access) {
+    // access tokens are short lived; trade the refresh token for a new one and retry once
+    const renewed = await refreshAccessToken()
+    if (renewed) {
+      response = await send(url, options, renewed)
+    }
+  }
+
   const text = await response.text()
   let data = null
   try {
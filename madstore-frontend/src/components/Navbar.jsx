@@ -2,6 +2,7 @@ import { NavLink, useLocation, useNavigate } from 'react-router-dom'
 import { useState } from 'react'
 import { useStore } from '../context/Store.jsx'
 import { resetCartCode } from '../utils.js'
+import { clearTokens } from '../api.js'
 
 const navLinkClass = ({ isActive }) =>
   `nav-link ${isActive ? 'active' : ''}`
@@ -34,6 +35,7 @@ function Navbar() {
 
   const handleLogout = () => {
     const nextCode = resetCartCode()
+    clearTokens()
     setUser(null)
     setEmail('guest@madstore.local')
     setWishlist([])
@@ -1,5 +1,6 @@
 import { useEffect } from 'react'
 import { useNavigate } from 'react-router-dom'
+import { clearTokens } from '../api.js'
 import { useStore } from '../context/Store.jsx'
 
 const defaultAvatar = '/default-avatar.svg'
@@ -9,6 +10,7 @@ function Account() {
   const navigate = useNavigate()
 
   const handleLogout = () => {
+    clearTokens()
     setUser(null)
     setEmail('guest@madstore.local')
     navigate('/')
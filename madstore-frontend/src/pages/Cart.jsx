@@ -49,6 +49,7 @@ function Cart() {
       const data = await api.put('update_cartitem_quantity/', {
         item_id: itemId,
         quantity: safeQuantity,
+        cart_code: cartCode,
       })
       const updated = data?.data || data?.['data ']
       if (!updated) return
@@ -80,7 +81,7 @@ function Cart() {
 
   const removeItem = async (itemId) => {
     try {
-      await api.del(`delete_cart_item/${itemId}/`)
+      await api.del(`delete_cart_item/${itemId}/?cart_code=${encodeURIComponent(cartCode)}`)
       const nextItems = cart.cartitems.filter((item) => item.id !== itemId)
       const nextTotal = nextItems.reduce(
         (sum, item) => sum + item.quantity * Number(item.product.price),
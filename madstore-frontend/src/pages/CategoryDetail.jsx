@@ -6,12 +6,26 @@ import ProductCard from '../components/ProductCard.jsx'
 
 function CategoryDetail() {
   const { slug } = useParams()
-  const { cartCode, setCart, user, email, wishlist, setWishlist } = useStore()
+  const { cartCode, setCart, user, wishlist, setWishlist } = useStore()
   const navigate = useNavigate()
   const [category, setCategory] = useState(null)
   const [products, setProducts] = useState([])
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState('')
+  const [nextCursor, setNextCursor] = useState(null)
+
+  const loadMore = async () => {
+    if (!nextCursor) return
+    try {
+      const data = await api.get(
+        `category_detail/${slug}?cursor=${encodeURIComponent(nextCursor)}`
+      )
+      setProducts((prev) => [...prev, ...(data?.Product || [])])
+      setNextCursor(data?.next || null)
+    } catch (err) {
+      setError(err.message || 'Failed to load more products')
+    }
+  }
 
   useEffect(() => {
     const loadCategory = async () => {
@@ -22,6 +36,7 @@ function CategoryDetail() {
         const payload = Array.isArray(data) ? data[0] : data
         setCategory(payload || null)
         setProducts(payload?.Product || [])
+        setNextCursor(payload?.next || null)
       } catch (err) {
         setError(err.message || 'Failed to load category')
       } finally {
@@ -38,7 +53,7 @@ function CategoryDetail() {
     const loadWishlist = async () => {
       if (!user) return
       try {
-        const data = await api.get(`wishlist_item/?email=${encodeURIComponent(email)}`)
+        const data = await api.get('wishlist_item/')
         if (Array.isArray(data)) {
           setWishlist(data)
         }
@@ -47,7 +62,7 @@ function CategoryDetail() {
       }
     }
     loadWishlist()
-  }, [user, email, setWishlist])
+  }, [user, setWishlist])
 
   const addToCart = async (product) => {
     if (!user) {
@@ -72,7 +87,6 @@ function CategoryDetail() {
     }
     try {
       const data = await api.post('add_to_wishlist/', {
-        email,
         product_id: product.id,
       })
       if (data?.id) {
@@ -110,6 +124,11 @@ function CategoryDetail() {
             />
           ))}
         </div>
+        {!loading && nextCursor && (
+          <button type="button" className="button ghost" onClick={loadMore}>
+            Load more
+          </button>
+        )}
       </section>
     </div>
   )
@@ -7,7 +7,7 @@ import CategoryFilter from '../components/CategoryFilter.jsx'
 import ProductCard from '../components/ProductCard.jsx'
 
 function Home() {
-  const { cartCode, setCart, user, email, wishlist, setWishlist } = useStore()
+  const { cartCode, setCart, user, wishlist, setWishlist } = useStore()
   const location = useLocation()
   const navigate = useNavigate()
   const [products, setProducts] = useState([])
@@ -15,6 +15,20 @@ function Home() {
   const [carousel, setCarousel] = useState([])
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState('')
+  const [nextCursor, setNextCursor] = useState(null)
+
+  const loadMore = async () => {
+    if (!nextCursor) return
+    const query = new URLSearchParams(location.search).get('q')
+    const path = query ? `search?query=${encodeURIComponent(query)}&` : 'product/?'
+    try {
+      const data = await api.get(`${path}cursor=${encodeURIComponent(nextCursor)}`)
+      setProducts((prev) => [...prev, ...(data?.results || [])])
+      setNextCursor(data?.next || null)
+    } catch (err) {
+      setError(err.message || 'Failed to load more products')
+    }
+  }
 
   const loadHome = async () => {
     try {
@@ -24,7 +38,8 @@ function Home() {
         api.get('categories/'),
         api.get('carousel/'),
       ])
-      setProducts(productData || [])
+      setProducts(productData?.results || [])
+      setNextCursor(productData?.next || null)
       setCategories(categoryData || [])
       setCarousel(carouselData || [])
     } catch (err) {
@@ -42,7 +57,8 @@ function Home() {
         try {
           setLoading(true)
           const data = await api.get(`search?query=${encodeURIComponent(query)}`)
-          setProducts(data || [])
+          setProducts(data?.results || [])
+          setNextCursor(data?.next || null)
         } catch (err) {
           setError(err.message || 'Failed to search products')
         } finally {
@@ -59,7 +75,7 @@ function Home() {
     const loadWishlist = async () => {
       if (!user) return
       try {
-        const data = await api.get(`wishlist_item/?email=${encodeURIComponent(email)}`)
+        const data = await api.get('wishlist_item/')
         if (Array.isArray(data)) {
           setWishlist(data)
         }
@@ -68,7 +84,7 @@ function Home() {
       }
     }
     loadWishlist()
-  }, [user, email, setWishlist])
+  }, [user, setWishlist])
 
   const handleCategorySelect = (slug) => {
     if (!slug) {
@@ -101,7 +117,6 @@ function Home() {
     }
     try {
       const data = await api.post('add_to_wishlist/', {
-        email,
         product_id: product.id,
       })
       if (data?.id) {
@@ -169,6 +184,11 @@ function Home() {
             />
           ))}
         </div>
+        {!loading && nextCursor && (
+          <button type="button" className="button ghost" onClick={loadMore}>
+            Load more
+          </button>
+        )}
       </section>
     </div>
   )
@@ -1,6 +1,6 @@
 import { useCallback, useEffect, useRef, useState } from 'react'
 import { useNavigate } from 'react-router-dom'
-import { api } from '../api.js'
+import { api, setTokens } from '../api.js'
 import { useStore } from '../context/Store.jsx'
 
 const initialForm = {
@@ -58,6 +58,7 @@ function Login() {
         payload
       )
       if (data?.user) {
+        setTokens(data)
         setUser(data.user)
         setEmail(data.user.email)
         navigate('/')
@@ -82,6 +83,7 @@ function Login() {
         setLoading(true)
         const data = await api.post('auth/google/', { id_token: idToken })
         if (data?.user) {
+          setTokens(data)
           setUser(data.user)
           setEmail(data.user.email)
           navigate('/')
@@ -39,8 +39,7 @@ function MyOrders() {
       }
       try {
         setLoading(true)
-        const targetEmail = (user?.email || email || '').toLowerCase()
-        const data = await api.get(`orders/?email=${encodeURIComponent(targetEmail)}`)
+        const data = await api.get('orders/')
         const normalized = Array.isArray(data) ? data : []
         setOrders(normalized)
         setOtpRequestedByOrder(
@@ -56,7 +55,7 @@ function MyOrders() {
       }
     }
     loadOrders()
-  }, [user?.email, email])
+  }, [user?.email])
 
   const handleSendOtp = async (event, orderId) => {
     event.stopPropagation()
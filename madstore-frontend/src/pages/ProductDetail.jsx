@@ -19,9 +19,10 @@ const renderStars = (rating = 0) => (
 function ProductDetail() {
   const { slug } = useParams()
   const navigate = useNavigate()
-  const { cartCode, setCart, wishlist, setWishlist, email, user } = useStore()
+  const { cartCode, setCart, wishlist, setWishlist, user } = useStore()
   const [product, setProduct] = useState(null)
   const [reviews, setReviews] = useState([])
+  const [reviewsCursor, setReviewsCursor] = useState(null)
   const [rating, setRating] = useState('5')
   const [reviewText, setReviewText] = useState('')
   const [currentImageIndex, setCurrentImageIndex] = useState(0)
@@ -49,7 +50,8 @@ function ProductDetail() {
       if (!product?.id) return
       try {
         const data = await api.get(`reviews/${product.id}/`)
-        setReviews(data || [])
+        setReviews(data?.results || [])
+        setReviewsCursor(data?.next || null)
       } catch (err) {
         setError(err.message || 'Failed to load reviews')
       }
@@ -57,6 +59,19 @@ function ProductDetail() {
     loadReviews()
   }, [product?.id])
 
+  const loadMoreReviews = async () => {
+    if (!reviewsCursor) return
+    try {
+      const data = await api.get(
+        `reviews/${product.id}/?cursor=${encodeURIComponent(reviewsCursor)}`
+      )
+      setReviews((prev) => [...prev, ...(data?.results || [])])
+      setReviewsCursor(data?.next || null)
+    } catch (err) {
+      setError(err.message || 'Failed to load more reviews')
+    }
+  }
+
   const productImages = useMemo(() => {
     const images = product?.all_images || []
     if (images.length) return images
@@ -100,7 +115,6 @@ function ProductDetail() {
     }
     try {
       const data = await api.post('add_to_wishlist/', {
-        email,
         product_id: product.id,
       })
       if (data?.id) {
@@ -123,7 +137,6 @@ function ProductDetail() {
     try {
       const data = await api.post('add_review/', {
         product_id: product.id,
-        email,
         rating,
         review: reviewText,
       })
@@ -197,6 +210,11 @@ function ProductDetail() {
               </div>
             ))}
           </div>
+          {reviewsCursor && (
+            <button type="button" className="button ghost" onClick={loadMoreReviews}>
+              Load more reviews
+            </button>
+          )}
           <form className="review-form" onSubmit={submitReview}>
             <div className="review-fields">
               <label>
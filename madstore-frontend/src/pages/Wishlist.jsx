@@ -5,7 +5,7 @@ import { useStore } from '../context/Store.jsx'
 import { formatPrice, resolveImageUrl } from '../utils.js'
 
 function Wishlist() {
-  const { wishlist, setWishlist, email, user, cartCode, setCart } = useStore()
+  const { wishlist, setWishlist, user, cartCode, setCart } = useStore()
   const navigate = useNavigate()
   const [error, setError] = useState('')
 
@@ -13,24 +13,20 @@ function Wishlist() {
     const loadWishlist = async () => {
       if (!user) return
       try {
-        const data = await api.get(`wishlist_item/?email=${encodeURIComponent(email)}`)
+        const data = await api.get('wishlist_item/')
         if (Array.isArray(data)) {
           setWishlist(data)
         }
       } catch (err) {
-        setError(
-          err.message ||
-            'Wishlist endpoint did not accept query params. Showing local data.'
-        )
+        setError(err.message || 'Failed to load wishlist. Showing local data.')
       }
     }
     loadWishlist()
-  }, [email, setWishlist, user])
+  }, [setWishlist, user])
 
   const removeFromWishlist = async (productId) => {
     try {
       await api.post('add_to_wishlist/', {
-        email,
         product_id: productId,
       })
       setWishlist((prev) => prev.filter((item) => item.product?.id !== productId))